@@ -1,25 +1,99 @@
-from flask import Blueprint, jsonify, request
-from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request, url_for
+from datetime import datetime, timezone
 from app.OpenAIConfig.openai_client import OpenAIClient
-from app.Scrappers.reddit import RedditScraper
-from app.Scrappers.tiktok import scrape_tiktok
-from app.Scrappers.facebook import FacebookScraper
-from concurrent.futures import ThreadPoolExecutor
-from app.Models.models import CommentRedis
-import uuid
+from app.services.sentiment_executor import get_sentiment_executor
+from app.services.scrape_pipeline import (
+    ensure_influencer, influencer_name_from_query, run_scrape_all,
+    scrape_platform
+)
+from app.services.scrape_cache import cached_scrape
+from app.Models.models import CommentRedis, ScrapeJobRedis, WordCloudRedis
+from app.config import Config
+from app.RedisController.sentiment_cache import sentiment_cache
+from app.RedisController.local_cache import get_read_cache
 import re
-import random
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from io import BytesIO
 import base64
+import math
+import json
+import queue
+import threading
+from app.services.wordcloud_service import get_wordcloud
 
 from app.Models.models import InfluencerRedis
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+STREAM_MIMETYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+def requested_stream_format(data):
+    """Formato de streaming pedido en el cuerpo ("stream") o en la cabecera Accept, o None."""
+    fmt = data.get('stream')
+    if fmt in STREAM_MIMETYPES:
+        return fmt
+    # Solo si el cliente lo pide explícitamente (un "*/*" no activa el streaming)
+    accepted = {value for value, quality in request.accept_mimetypes if quality > 0}
+    for fmt, mimetype in STREAM_MIMETYPES.items():
+        if mimetype in accepted:
+            return fmt
+    return None
+
+def format_stream_event(fmt, event, payload):
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    return json.dumps({"event": event, "data": payload}, ensure_ascii=False) + "\n"
+
+def stream_scrape_all(query, limit, fmt):
+    """
+    Lanza run_scrape_all en segundo plano y emite cada comentario en cuanto se conoce
+    su sentimiento, intercalando plataformas. El guardado en Redis sigue ocurriendo
+    en los hilos de scraping aunque el cliente se desconecte.
+    """
+    events = queue.Queue()
+    app = current_app._get_current_object()
+
+    def on_batch(comments):
+        for comment in comments:
+            events.put(("comment", dict(comment)))
+
+    def on_platform_done(platform, comments, error):
+        payload = {"platform": platform, "count": len(comments)}
+        if error:
+            payload["error"] = str(error)
+        events.put(("platform_done", payload))
+
+    def run():
+        try:
+            with app.app_context():
+                results = run_scrape_all(query, limit, on_platform_done=on_platform_done, on_batch=on_batch)
+            events.put(("done", {"influencer": influencer_name_from_query(query), "total": len(results)}))
+        except Exception as e:
+            events.put(("error", {"error": str(e)}))
+        events.put(None)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    def generate():
+        while True:
+            item = events.get()
+            if item is None:
+                return
+            yield format_stream_event(fmt, *item)
+
+    response = Response(generate(), mimetype=STREAM_MIMETYPES[fmt])
+    response.headers["Cache-Control"] = "no-cache"
+    # Evitar que un proxy (nginx) acumule la respuesta
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
 @api_bp.route('/scrape/all', methods=['POST'])
 def scrape_all():
+    """
+    Scrapea Reddit, TikTok y Facebook en paralelo.
+    Con "async": true en el cuerpo encola un job y responde 202 con su id
+    (lo procesa el worker: flask --app app:create_app scrape-worker).
+    Con "stream": "ndjson" | "sse" (o Accept: application/x-ndjson / text/event-stream)
+    emite cada comentario analizado en cuanto está listo.
+    """
     data = request.get_json()
     query = data.get('query')
     limit = int(data.get('limit', 5))
@@ -27,103 +101,57 @@ def scrape_all():
     if not query:
         return jsonify({"error": "Debe proporcionar una búsqueda (influencer o palabra clave)"}), 400
 
-    influencer_name = query.replace("#", "").replace("@", "")
+    influencer_name = influencer_name_from_query(query)
 
-    # Check Redis 
-    if not InfluencerRedis.exists(influencer_name):
-        InfluencerRedis.save(influencer_name)
-
-    gpt = OpenAIClient()  # <-- temporarily disabled
-    results = []
-    executor = ThreadPoolExecutor(max_workers=3)
-
-    # Funciones para cada scrapper
-    def scrape_reddit():
-        scraper = RedditScraper(keywords=[query], limit=limit)
-        raw_posts = scraper.scrape()
-        print("Reddit raw posts:", raw_posts)
-        comments = []
-        for post in raw_posts:
-            full_text = f"{post['title']} {post['selftext']}".strip()
-            sentiment, score = gpt.analyze_sentiment(full_text)
-            comments.append({
-                "platform": "reddit",
-                "influencer": query,
-                "text": full_text,
-                "sentiment": sentiment,
-                "score": score,
-                "date": post['created_utc'].isoformat()
-            })
-        return comments
-
-    def scrape_tiktok_func():
-        tiktok_comments = scrape_tiktok(query=query, num_videos=limit)
-        print("TikTok comments:", tiktok_comments)
-        comments = []
-        for c in tiktok_comments:
-            full_text = f"{c['title']} {c['text']}".strip()
-            sentiment, score = gpt.analyze_sentiment(full_text)
-            comments.append({
-                "platform": "tiktok",
-                "influencer": query,
-                "text": full_text,
-                "sentiment": sentiment,
-                "score": score,
-                "date": datetime.utcnow().isoformat()
-            })
-        return comments
-
-
-    def scrape_facebook():
-        fb_scraper = FacebookScraper()
-        fb_posts = fb_scraper.search(query)
-        comments = []
-        gpt = OpenAIClient()
-        for post in fb_posts:
-            post_title = post.get("postTitle", "")
-            post_comments = post.get("comments", [])
-
-            for comment in post_comments:
-                
-                comment_text = comment.get("comment", "").strip()
-                full_text = f"{comment_text}" 
-
-                sentiment, score = gpt.analyze_sentiment(full_text)
-                comments.append({
-                    "platform": "facebook",
-                    "influencer": post.get("influencer", "unknown"),
-                    "text": full_text,
-                    "sentiment": sentiment,
-                    "score": score,
-                    "date": post.get("date", datetime.utcnow().isoformat()),
-                })
-
-        return comments
-
-    # Ejecutar los 3 scrappers en paralelo
-    futures = [
-        executor.submit(scrape_reddit),
-        executor.submit(scrape_tiktok_func),
-        executor.submit(scrape_facebook)
-    ]
-
-    for future in futures:
-        try:
-            results.extend(future.result())
-        except Exception as e:
-            print(f"Error in scrapper thread: {e}")
+    stream_format = requested_stream_format(data)
+    if stream_format:
+        return stream_scrape_all(query, limit, stream_format)
+
+    if data.get('async'):
+        job_id = ScrapeJobRedis.enqueue(query, limit)
+        return jsonify({
+            "message": f"Scraping encolado para {influencer_name}",
+            "job_id": job_id,
+            "status_url": url_for('api.get_job', job_id=job_id)
+        }), 202
 
-    # Añadir influencer a cada comentario para el JSON de salida
-    for c in results:
-        c["influencer"] = influencer_name
-        comment_id = str(uuid.uuid4())
-        CommentRedis.save_comment(comment_id, influencer_name, c)
+    results = run_scrape_all(query, limit)
 
     return jsonify({
         "message": f"Scraping completo para {influencer_name}",
         "comments": results
     }), 200
 
+@api_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Estado de un job de scraping: progreso por plataforma y, al terminar, los comentarios."""
+    job = ScrapeJobRedis.get(job_id)
+    if not job:
+        return jsonify({"error": "Job no encontrado"}), 404
+    if request.args.get("include_results", "true").lower() in ("0", "false", "no"):
+        job.pop("results", None)
+    return jsonify(job), 200
+
+def parse_max_age(data):
+    """max_age (segundos) del cuerpo o de la query string; None si no se indica. Lanza ValueError si no es válido."""
+    value = data.get('max_age', request.args.get('max_age'))
+    if value is None or value == "":
+        return None
+    max_age = int(value)
+    if max_age < 0:
+        raise ValueError(value)
+    return max_age
+
+def cached_scrape_response(influencer_name, platform, refresh, max_age, done_message):
+    """Responde con los comentarios de la plataforma según la política de caché, con X-Cache y Age."""
+    comments, status, age = cached_scrape(influencer_name, platform, refresh, max_age)
+    message = "Comentarios en caché" if status != "MISS" else done_message
+    response = jsonify({"message": message, "comments": comments})
+    response.headers["X-Cache"] = status
+    if age is not None:
+        response.headers["Age"] = str(int(age))
+    return response, 200
+
 @api_bp.route('/scrape/reddit', methods=['POST'])
 def scrape_reddit_route():
     data = request.get_json()
@@ -133,38 +161,26 @@ def scrape_reddit_route():
 
     if not keywords:
         return jsonify({"error": "Debe proporcionar al menos una palabra clave"}), 400
+    try:
+        max_age = parse_max_age(data)
+    except ValueError:
+        return jsonify({"error": "max_age debe ser un número de segundos >= 0"}), 400
 
     query = keywords[0]  # usa la primera keyword para el influencer_name
-    influencer_name = query.replace("#", "").replace("@", "")
+    influencer_name = influencer_name_from_query(query)
+    ensure_influencer(influencer_name)
 
-    cached = CommentRedis.get_comments_by_influencer_and_platform(influencer_name, "reddit")
-    if cached:
-        return jsonify({"message": "Comentarios en caché", "comments": cached}), 200
+    max_api_calls = data.get('max_api_calls')
+    options = {
+        "keywords": keywords,
+        "include_comments": bool(data.get('include_comments', False)),
+        "max_api_calls": int(max_api_calls) if max_api_calls is not None else None
+    }
 
-    if not InfluencerRedis.exists(influencer_name):
-        InfluencerRedis.save(influencer_name)
-
-    gpt = OpenAIClient()
-    scraper = RedditScraper(keywords=keywords, limit=limit)
-    raw_posts = scraper.scrape()
-
-    comments = []
-    for post in raw_posts:
-        full_text = f"{post['title']} {post['selftext']}".strip()
-        sentiment, score = gpt.analyze_sentiment(full_text)
-        comment_data = {
-            "platform": "reddit",
-            "influencer": influencer_name,
-            "text": full_text,
-            "sentiment": sentiment,
-            "score": score,
-            "date": post['created_utc'].isoformat()
-        }
-        comment_id = str(uuid.uuid4())
-        CommentRedis.save_comment(comment_id, influencer_name, comment_data)
-        comments.append(comment_data)
-
-    return jsonify({"message": "Scraping de Reddit completado", "comments": comments}), 200
+    def refresh():
+        scrape_platform("reddit", influencer_name, query, limit, **options)
+
+    return cached_scrape_response(influencer_name, "reddit", refresh, max_age, "Scraping de Reddit completado")
 
 @api_bp.route('/scrape/tiktok', methods=['POST'])
 def scrape_tiktok_route():
@@ -174,39 +190,18 @@ def scrape_tiktok_route():
 
     if not query:
         return jsonify({"error": "Debe proporcionar una búsqueda"}), 400
+    try:
+        max_age = parse_max_age(data)
+    except ValueError:
+        return jsonify({"error": "max_age debe ser un número de segundos >= 0"}), 400
 
-    influencer_name = query.replace("#", "").replace("@", "")
+    influencer_name = influencer_name_from_query(query)
+    ensure_influencer(influencer_name)
 
-    # Check cache first
-    cached = CommentRedis.get_comments_by_influencer_and_platform(influencer_name, "tiktok")
-    if cached:
-        print("TikTok: Returning cached comments")
-        return jsonify({"message": "Comentarios en caché", "comments": cached}), 200
+    def refresh():
+        scrape_platform("tiktok", influencer_name, query, limit)
 
-    # If no cached comments, continue scraping
-    if not InfluencerRedis.exists(influencer_name):
-        InfluencerRedis.save(influencer_name)
-
-    gpt = OpenAIClient()
-    tiktok_comments = scrape_tiktok(query=query, num_videos=limit)
-
-    comments = []
-    for c in tiktok_comments:
-        full_text = f"{c['title']} {c['text']}".strip()
-        sentiment, score = gpt.analyze_sentiment(full_text)
-        comment_data = {
-            "platform": "tiktok",
-            "influencer": influencer_name,
-            "text": full_text,
-            "sentiment": sentiment,
-            "score": score,
-            "date": datetime.utcnow().isoformat()
-        }
-        comment_id = str(uuid.uuid4())
-        CommentRedis.save_comment(comment_id, influencer_name, comment_data)
-        comments.append(comment_data)
-
-    return jsonify({"message": "Scraping de TikTok completado", "comments": comments}), 200
+    return cached_scrape_response(influencer_name, "tiktok", refresh, max_age, "Scraping de TikTok completado")
 
 @api_bp.route('/scrape/facebook', methods=['POST'])
 def scrape_facebook_route():
@@ -216,90 +211,128 @@ def scrape_facebook_route():
 
     if not query:
         return jsonify({"error": "Debe proporcionar una búsqueda"}), 400
+    try:
+        max_age = parse_max_age(data)
+    except ValueError:
+        return jsonify({"error": "max_age debe ser un número de segundos >= 0"}), 400
 
-    influencer_name = query.replace("#", "").replace("@", "")
-    cached = CommentRedis.get_comments_by_influencer_and_platform(influencer_name, "tiktok")
-    if cached:
-        print("TikTok: Returning cached comments")
-        return jsonify({"message": "Comentarios en caché", "comments": cached}), 200
+    influencer_name = influencer_name_from_query(query)
+    ensure_influencer(influencer_name)
 
-    # If no cached comments, continue scraping
-    if not InfluencerRedis.exists(influencer_name):
-        InfluencerRedis.save(influencer_name)
-
-    gpt = OpenAIClient()
-    fb_scraper = FacebookScraper()
-    fb_posts = fb_scraper.search(query)
-
-    comments = []
-    for post in fb_posts:
-        post_title = post.get("postTitle", "")
-        post_comments = post.get("comments", [])
-
-        for comment in post_comments:
-            comment_text = comment.get("comment", "").strip()
-            full_text = f"{comment_text}"
-            sentiment, score = gpt.analyze_sentiment(full_text)
-
-            comment_data = {
-                "platform": "facebook",
-                "influencer": influencer_name,
-                "text": full_text,
-                "sentiment": sentiment,
-                "score": score,
-                "date": post.get("date", datetime.utcnow().isoformat())
-            }
-            comment_id = str(uuid.uuid4())
-            CommentRedis.save_comment(comment_id, influencer_name, comment_data)
-            comments.append(comment_data)
-
-    return jsonify({"message": "Scraping de Facebook completado", "comments": comments}), 200
+    def refresh():
+        scrape_platform("facebook", influencer_name, query, limit)
+
+    return cached_scrape_response(influencer_name, "facebook", refresh, max_age, "Scraping de Facebook completado")
+
+@api_bp.route('/cache/sentiment', methods=['GET'])
+def sentiment_cache_stats():
+    """Contadores de aciertos/fallos de la caché de sentimientos de este proceso."""
+    return jsonify(sentiment_cache.stats()), 200
+
+@api_bp.route('/cache/read', methods=['GET'])
+def read_cache_stats():
+    """Contadores de la caché local de lecturas (influencers y páginas de comentarios) de este proceso."""
+    cache = get_read_cache()
+    return jsonify(cache.stats() if cache else {"enabled": False}), 200
+
+@api_bp.route('/sentiment/stats', methods=['GET'])
+def sentiment_path_stats():
+    """Textos clasificados en este proceso por el léxico local, la caché de sentimientos y el LLM."""
+    return jsonify(get_sentiment_executor().stats()), 200
 
 def normalize_influencer_name(name: str) -> str:
     return name.lower().replace("_", " ").strip()
 
+def parse_time_param(value):
+    """
+    Acepta epoch (segundos) o fecha ISO 8601 (sin zona = UTC). Lanza ValueError si no es válida
+    (también con "nan" o "inf", que float() acepta pero no sirven como límite de ZRANGEBYSCORE).
+    """
+    if not value:
+        return None
+    try:
+        epoch = float(value)
+    except ValueError:
+        dt = datetime.fromisoformat(value)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    if not math.isfinite(epoch):
+        raise ValueError(f"Epoch no finito: {value}")
+    return epoch
+
 @api_bp.route('/comments/<influencer_name>', methods=['GET'])
 def get_comments(influencer_name):
-    print(f"[DEBUG] influencer_name recibido: '{influencer_name}'")
-    exists = InfluencerRedis.exists(influencer_name)
-    print(f"{influencer_name} exists")
-    print(f"[DEBUG] Influencer exists in Redis? {exists}")
-
-    if not exists:
+    """
+    Comentarios del influencer, del más reciente al más antiguo.
+    Parámetros opcionales: limit, cursor, since, until (epoch o ISO 8601) y platform.
+    Si hay más resultados, el cursor de la siguiente página va en la cabecera X-Next-Cursor.
+    """
+    if not InfluencerRedis.exists(influencer_name):
         return jsonify({"error": "Influencer no encontrado"}), 404
 
-    comments = CommentRedis.get_comments_by_influencer(influencer_name)
-    if not comments:
-        return jsonify([]), 200
+    args = request.args
+    try:
+        since = parse_time_param(args.get("since"))
+        until = parse_time_param(args.get("until"))
+    except ValueError:
+        return jsonify({"error": "since/until deben ser epoch o fecha ISO 8601"}), 400
+
+    limit = None
+    if args.get("limit"):
+        try:
+            limit = int(args["limit"])
+        except ValueError:
+            return jsonify({"error": "limit debe ser un entero"}), 400
+        limit = max(1, min(limit, Config.COMMENTS_PAGE_MAX_LIMIT))
 
-    comments_sorted = sorted(comments, key=lambda c: c.get("date", ""), reverse=True)
-    return jsonify(comments_sorted), 200
+    cursor = args.get("cursor")
+    if cursor:
+        try:
+            cursor_score, cursor_offset = cursor.split(":")
+            if not math.isfinite(float(cursor_score)) or int(cursor_offset) < 0:
+                raise ValueError(cursor)
+        except ValueError:
+            return jsonify({"error": "cursor inválido"}), 400
+
+    comments, next_cursor = CommentRedis.get_comments_page(
+        influencer_name,
+        platform=args.get("platform"),
+        limit=limit,
+        cursor=cursor,
+        since=since,
+        until=until
+    )
+
+    response = jsonify(comments)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response, 200
 
 @api_bp.route('/analytics/<influencer_name>', methods=['GET'])
 def influencer_analytics(influencer_name):
+    """
+    Métricas, karma y recomendación del influencer.
+    Con ?include_wordcloud=false se omite la imagen inline; siempre se incluye
+    wordcloud_url para descargar el PNG aparte (cacheable con ETag).
+    """
+    include_wordcloud = request.args.get("include_wordcloud", "true").lower() not in ("0", "false", "no")
+
     if not InfluencerRedis.exists(influencer_name):
         return jsonify({"error": "Influencer no encontrado"}), 404
 
-    comments = CommentRedis.get_comments_by_influencer(influencer_name)
-    if not comments:
+    # 1. Métricas básicas desde los agregados mantenidos en escritura
+    stats = CommentRedis.get_stats(influencer_name)
+    total = stats["total"]
+    if not total:
         return jsonify({"error": "No se encontraron comentarios"}), 404
 
-    # 1. Calcular métricas básicas
-    total = len(comments)
-    pos = [c for c in comments if c["sentiment"] == "positivo"]
-    neg = [c for c in comments if c["sentiment"] == "negativo"]
-    neu = [c for c in comments if c["sentiment"] == "neutral"]
-    
-    scores = [c["score"] for c in comments if isinstance(c["score"], (int, float))]
-    avg_score = sum(scores) / len(scores) if scores else 0.0
-    
+    pos, neg, neu = stats["positive"], stats["negative"], stats["neutral"]
+    avg_score = stats["average_score"]
+
     # 2. Preparar datos para OpenAI
-    # Seleccionar una muestra representativa de comentarios
-    sample_comments = []
-    if total > 0:
-        # Tomar hasta 8 comentarios representativos (2 positivos, 2 negativos, 2 neutrales, 2 mixtos)
-        sample_size = min(total, 8)
-        sample_comments = random.sample(comments, sample_size)
+    # Seleccionar una muestra aleatoria de hasta 8 comentarios
+    sample_comments = CommentRedis.get_random_comments(influencer_name, min(total, 8))
     
     # Crear prompt para OpenAI
     prompt = f"""
@@ -318,9 +351,9 @@ def influencer_analytics(influencer_name):
 
     Datos de análisis:
     - Total de comentarios: {total}
-    - Comentarios positivos: {len(pos)} ({round(len(pos)/total*100, 1)}%)
-    - Comentarios negativos: {len(neg)} ({round(len(neg)/total*100, 1)}%)
-    - Comentarios neutrales: {len(neu)} ({round(len(neu)/total*100, 1)}%)
+    - Comentarios positivos: {pos} ({round(pos/total*100, 1)}%)
+    - Comentarios negativos: {neg} ({round(neg/total*100, 1)}%)
+    - Comentarios neutrales: {neu} ({round(neu/total*100, 1)}%)
     - Puntuación promedio: {round(avg_score, 2)}
 
     Ejemplos de comentarios:
@@ -332,7 +365,7 @@ def influencer_analytics(influencer_name):
     """
     # 3. Obtener análisis de OpenAI
     try:
-        gpt = OpenAIClient()
+        gpt = OpenAIClient(limiter=get_sentiment_executor().limiter)
         response_text = gpt.get_completion(prompt)
         
         # Parsear la respuesta
@@ -347,34 +380,58 @@ def influencer_analytics(influencer_name):
         else:
             # Si el formato no es correcto, usar la respuesta completa como recomendación
             recommendation = response_text
-            karma_score = calculate_fallback_karma(len(pos), len(neg), len(neu), avg_score)
+            karma_score = calculate_fallback_karma(pos, neg, neu, avg_score)
             
     except Exception as e:
         print(f"Error al obtener análisis de OpenAI: {str(e)}")
         # Fallback a cálculo básico si OpenAI falla
-        karma_score = calculate_fallback_karma(len(pos), len(neg), len(neu), avg_score)
-        recommendation = generate_fallback_recommendation(karma_score, len(pos), len(neg), len(neu))
-
-    # Generar nube de palabras
-    texts = [c['text'] for c in comments]
-    wordcloud_img = generate_wordcloud(texts)
+        karma_score = calculate_fallback_karma(pos, neg, neu, avg_score)
+        recommendation = generate_fallback_recommendation(karma_score, pos, neg, neu)
 
     # 4. Preparar respuesta
-    return jsonify({
+    response = {
         "total": total,
-        "positive": len(pos),
-        "neutral": len(neu),
-        "negative": len(neg),
+        "positive": pos,
+        "neutral": neu,
+        "negative": neg,
         "average_score": avg_score,
         "karma_score": karma_score,
         "recommendation": recommendation,
-        "wordcloud": wordcloud_img
-    }), 200
+        "wordcloud_url": url_for('api.influencer_wordcloud', influencer_name=influencer_name)
+    }
+    if include_wordcloud:
+        # Generar nube de palabras
+        response["wordcloud"] = generate_wordcloud(influencer_name)
+    return jsonify(response), 200
+
+@api_bp.route('/analytics/<influencer_name>/wordcloud.png', methods=['GET'])
+def influencer_wordcloud(influencer_name):
+    """
+    Nube de palabras como PNG binario. El ETag es el hash del PNG cacheado para la versión
+    actual de la tabla de frecuencias, así que un If-None-Match vigente responde 304 sin renderizar.
+    """
+    if not InfluencerRedis.exists(influencer_name):
+        return jsonify({"error": "Influencer no encontrado"}), 404
+
+    img_base64, etag = get_wordcloud(influencer_name, WordCloudRedis.get_version(influencer_name))
+    if not img_base64:
+        return jsonify({"error": "No hay palabras para la nube"}), 404
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(base64.b64decode(img_base64), mimetype="image/png")
+
+    response.set_etag(etag)
+    # El cliente puede guardarla pero debe revalidar con el ETag
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 # Funciones auxiliares
 def format_sample_comments(comments):
     """Formatea comentarios para incluirlos en el prompt"""
     formatted = []
+    # Los comentarios que no se pudieron clasificar no tienen sentimiento ni score
+    comments = [comment for comment in comments if comment.get('score') is not None]
     for i, comment in enumerate(comments):
         formatted.append(f"{i+1}. [{comment['sentiment']} - {comment['score']:.2f}] {comment['text'][:150]}{'...' if len(comment['text']) > 150 else ''}")
     return "\n".join(formatted)
@@ -427,28 +484,7 @@ def generate_fallback_recommendation(karma_score, pos, neg, neu):
             "3. Considerar cambios estratégicos basados en los comentarios más negativos"
         )
     
-def generate_wordcloud(texts):
-    # Unir todos los comentarios
-    all_text = " ".join(texts)
-    
-    # Crear y configurar wordcloud
-    wordcloud = WordCloud(
-        width=800,
-        height=400,
-        background_color='white',
-        max_words=100,
-        colormap='viridis'
-    ).generate(all_text)
-    
-    # Guardar en buffer
-    buffer = BytesIO()
-    plt.figure(figsize=(10, 5))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis("off")
-    plt.savefig(buffer, format='png')
-    plt.close()
-    buffer.seek(0)
-    
-    # Convertir a base64
-    img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-    return f"data:image/png;base64,{img_base64}"
\ No newline at end of file
+def generate_wordcloud(influencer_name):
+    """Nube de palabras como data URI, renderizada desde la tabla de frecuencias cacheada."""
+    img_base64, _ = get_wordcloud(influencer_name, WordCloudRedis.get_version(influencer_name))
+    return f"data:image/png;base64,{img_base64}" if img_base64 else None
@@ -0,0 +1,142 @@
+"""
+Benchmark y verificación de equivalencia del motor de limpieza (app/services/cleaner.py)
+frente a las implementaciones anteriores de TextCleaner.clean y clean_text.
+
+Uso: python -m app.Executable_Scripts.benchmark_cleaner [ruta/a/all_posts.json] [--repeat N]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import unicodedata
+
+from app.services.cleaner import clean_many, clean_text_many
+
+
+# Implementaciones anteriores, conservadas como referencia
+def legacy_clean(text):
+    text = text.lower()
+    text = re.compile(
+        "["
+        u"\U0001F600-\U0001F64F"
+        u"\U0001F300-\U0001F5FF"
+        u"\U0001F680-\U0001F6FF"
+        u"\U0001F1E0-\U0001F1FF"
+        u"\U00002500-\U00002BEF"
+        u"\U00002702-\U000027B0"
+        u"\U000024C2-\U0001F251"
+        u"\U0001f926-\U0001f937"
+        u"\U00010000-\U0010ffff"
+        u"\u2640-\u2642"
+        u"\u2600-\u2B55"
+        u"\u200d"
+        u"\u23cf"
+        u"\u23e9"
+        u"\u231a"
+        u"\ufe0f"
+        u"\u3030"
+        "]+",
+        flags=re.UNICODE
+    ).sub(r'', text)
+    text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', '', text)
+    return text.strip()
+
+
+def legacy_clean_text(text):
+    if not text:
+        return ""
+    text = text.encode('ascii', 'ignore').decode('ascii')
+    text = text.lower()
+    text = re.sub(r'\[.*?\]\(.*?\)', '', text)
+    text = re.sub(r'http\S+|www\.\S+|\S+\.com\S*|\S+\.org\S*|\S+\.net\S*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\S+\.(io|co|ai|tv|gov|edu)\S*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r"[^a-z0-9\s\.\,\!\?\-]", '', text)
+    text = re.sub(r"\s+", ' ', text)
+    return text.strip()
+
+
+# Fragmentos que aparecen en comentarios reales sin limpiar
+NOISE = [
+    "😂😂", "🔥", "❤️", "👍🏽", "🇵🇷", "¡Qué", "niño", "Ñandú", "ÁÉÍÓÚ", "canción", "ΣΟΦΟΣ", "İstanbul",
+    "ﬁnal", "①②", "™", "https://youtu.be/abc?x=1", "www.ejemplo.com/ruta", "[link](http://a.io)",
+    "visita.io", "@usuario", "#hashtag", "...", "!!!", "--", "\t", "\n", "  ", "中文", "한국어", "\u200d", "\u212a"
+]
+
+
+def load_texts(path):
+    with open(path, encoding='utf-8') as f:
+        posts = json.load(f)
+    texts = []
+    for post in posts:
+        texts.append(post.get("postTitle", ""))
+        texts.extend(c.get("comment", "") for c in post.get("comments", []))
+    return [t for t in texts if t]
+
+
+def noisy_corpus(texts, size, seed=0):
+    """Corpus del tamaño pedido mezclando los textos del archivo con emojis, acentos y URLs."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.choice(texts).split()
+        for _ in range(rng.randint(1, 6)):
+            words.insert(rng.randint(0, len(words)), rng.choice(NOISE))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+def check_codepoints():
+    """Compara ambas implementaciones carácter a carácter en todo Unicode."""
+    mismatches = []
+    for codepoint in range(sys.maxunicode + 1):
+        if 0xD800 <= codepoint <= 0xDFFF:
+            continue
+        char = chr(codepoint)
+        sample = f"a{char}b {char}"
+        if clean_many([sample])[0] != legacy_clean(sample):
+            mismatches.append(("clean", hex(codepoint)))
+        if clean_text_many([sample])[0] != legacy_clean_text(sample):
+            mismatches.append(("clean_text", hex(codepoint)))
+    return mismatches
+
+
+def timed(fn, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", nargs="?", default="all_posts.json")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = noisy_corpus(load_texts(args.path), args.size)
+
+    print("Verificando equivalencia en todos los code points...")
+    mismatches = check_codepoints()
+    for new_fn, old_fn, name in ((clean_many, legacy_clean, "clean"), (clean_text_many, legacy_clean_text, "clean_text")):
+        expected = [old_fn(t) for t in corpus]
+        if new_fn(corpus) != expected:
+            mismatches.append((name, "corpus"))
+    if mismatches:
+        print(f"Diferencias encontradas: {mismatches[:20]}")
+        sys.exit(1)
+    print(f"Salida idéntica ({len(corpus)} textos)")
+
+    for new_fn, old_fn, name in ((clean_many, legacy_clean, "clean"), (clean_text_many, legacy_clean_text, "clean_text")):
+        old = timed(lambda texts: [old_fn(t) for t in texts], corpus, args.repeat)
+        new = timed(new_fn, corpus, args.repeat)
+        print(f"{name:>10}: anterior {old * 1000:8.1f} ms | nuevo {new * 1000:8.1f} ms | x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
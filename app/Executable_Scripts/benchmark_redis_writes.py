@@ -0,0 +1,96 @@
+"""
+Benchmark de escritura de comentarios en Redis. La referencia es la escritura original, sin
+pipeline: SET del comentario y SADD en el índice del influencer, dos round trips por comentario.
+Se compara con save_comment en bucle (un pipeline por comentario, con índices y agregados) y con
+save_comments_bulk (un pipeline por bloque de REDIS_PIPELINE_CHUNK_SIZE).
+Escribe en la instancia configurada (REDIS_HOST/REDIS_PORT/REDIS_DB) bajo un influencer
+temporal y borra sus claves al terminar; conviene usar una base vacía (p. ej. REDIS_DB=15).
+
+Uso: python -m app.Executable_Scripts.benchmark_redis_writes [--count 10000] [--repeat 3]
+"""
+import argparse
+import json
+import time
+import uuid
+
+from app.Models.models import CommentRedis, r
+
+SAMPLE_TEXTS = [
+    "me encanta este video, el mejor contenido",
+    "no me gusto nada, muy aburrido",
+    "jajaja que buen momento",
+    "alguien sabe la cancion del minuto dos",
+    "pesimo servicio, una estafa",
+]
+PLATFORMS = ("reddit", "tiktok", "facebook")
+
+
+def make_comments(influencer_name, count):
+    now = time.time()
+    return [
+        {
+            "platform": PLATFORMS[i % len(PLATFORMS)],
+            "influencer": influencer_name,
+            "text": f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} {i}",
+            "sentiment": ("positivo", "negativo", "neutral")[i % 3],
+            "score": round((i % 21 - 10) / 10, 1),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(now - i * 60))
+        }
+        for i in range(count)
+    ]
+
+
+def cleanup(influencer_name, comment_ids):
+    """Borra los comentarios escritos y todas las claves derivadas del influencer temporal."""
+    keys = [f"comment:{cid}" for cid in comment_ids]
+    keys.extend(r.scan_iter(match=f"*:{influencer_name}*", count=1000))
+    for start in range(0, len(keys), 1000):
+        r.delete(*keys[start:start + 1000])
+
+
+def original_save_comment(comment_id, influencer_name, comment_data):
+    """CommentRedis.save_comment tal como era antes de los pipelines: dos round trips."""
+    r.set(f"comment:{comment_id}", json.dumps(comment_data))
+    r.sadd(f"influencer_comments:{influencer_name}", comment_id)
+
+
+def run_loop(comments, save=CommentRedis.save_comment):
+    influencer_name = f"__benchmark__{uuid.uuid4().hex[:8]}"
+    comment_ids = [str(uuid.uuid4()) for _ in comments]
+    start = time.perf_counter()
+    for comment_id, comment_data in zip(comment_ids, comments):
+        save(comment_id, influencer_name, comment_data)
+    elapsed = time.perf_counter() - start
+    cleanup(influencer_name, comment_ids)
+    return elapsed
+
+
+def run_bulk(comments):
+    influencer_name = f"__benchmark__{uuid.uuid4().hex[:8]}"
+    start = time.perf_counter()
+    comment_ids = CommentRedis.save_comments_bulk(influencer_name, comments)
+    elapsed = time.perf_counter() - start
+    cleanup(influencer_name, comment_ids)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    r.ping()
+    comments = make_comments("benchmark", args.count)
+    print(f"Escribiendo {args.count} comentarios, mejor de {args.repeat} repeticiones")
+
+    original = min(run_loop(comments, original_save_comment) for _ in range(args.repeat))
+    loop = min(run_loop(comments) for _ in range(args.repeat))
+    bulk = min(run_bulk(comments) for _ in range(args.repeat))
+    print(f"original (SET + SADD)  : {original:8.2f} s | {args.count / original:9.0f} comentarios/s")
+    print(f"save_comment en bucle  : {loop:8.2f} s | {args.count / loop:9.0f} comentarios/s | x{original / loop:.1f}")
+    print(f"save_comments_bulk     : {bulk:8.2f} s | {args.count / bulk:9.0f} comentarios/s | x{original / bulk:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de scrape_tiktok_page contra páginas guardadas (tiktok_fixtures/) servidas en local.
+El servidor imita a TikTok: listado del hashtag, página de video y comentarios paginados por
+/api/comment/list/ con una latencia configurable; se mide el scrape con distintas pestañas en paralelo.
+
+Uso: python -m app.Executable_Scripts.benchmark_tiktok [--videos 3] [--comments 60] [--delay 0.2]
+     [--parallelism 1,3] [--executable /ruta/a/chrome]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from playwright.sync_api import sync_playwright
+
+from app.config import Config
+from app.Scrappers.tiktok import COMMENT_API_PATH, scrape_tiktok_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "tiktok_fixtures")
+
+
+def load_comment_texts(path):
+    """Textos de comentarios reales de all_posts.json, o sintéticos si no está el fichero."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            posts = json.load(f)
+        texts = [c["comment"] for post in posts for c in post.get("comments", []) if c.get("comment")]
+    except (OSError, ValueError):
+        texts = []
+    return texts or [f"comentario de prueba {i}" for i in range(500)]
+
+
+def make_handler(texts, comments_per_video, page_size, delay):
+    with open(os.path.join(FIXTURES_DIR, "tag.html"), "rb") as f:
+        tag_page = f.read()
+    with open(os.path.join(FIXTURES_DIR, "video.html"), "rb") as f:
+        video_page = f.read()
+
+    class TikTokFixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.startswith(COMMENT_API_PATH):
+                self.send_comments(parse_qs(url.query))
+            elif "/video/" in url.path:
+                self.send_body(video_page, "text/html; charset=utf-8")
+            elif url.path.startswith("/tag/") or url.path.startswith("/@"):
+                self.send_body(tag_page, "text/html; charset=utf-8")
+            else:
+                self.send_error(404)
+
+        def send_comments(self, query):
+            if delay:
+                time.sleep(delay)
+            video_id = query.get("aweme_id", ["0"])[0]
+            cursor = int(query.get("cursor", ["0"])[0])
+            end = min(cursor + page_size, comments_per_video)
+            comments = [
+                {"cid": f"{video_id}{i:05d}", "text": texts[(int(video_id[-3:]) * 37 + i) % len(texts)]}
+                for i in range(cursor, end)
+            ]
+            body = {"comments": comments, "cursor": end, "has_more": int(end < comments_per_video)}
+            self.send_body(json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json")
+
+        def send_body(self, data, content_type):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return TikTokFixtureHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, default=3)
+    parser.add_argument("--comments", type=int, default=60, help="comentarios por video")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.2, help="latencia de cada página de comentarios")
+    parser.add_argument("--parallelism", default="1,3", help="pestañas en paralelo a comparar")
+    parser.add_argument("--data", default="all_posts.json")
+    parser.add_argument("--executable", default=None, help="Chromium/Chrome a usar en vez del de Playwright")
+    args = parser.parse_args()
+
+    handler = make_handler(load_comment_texts(args.data), args.comments, args.page_size, args.delay)
+    server = ThreadingHTTPServer(("localhost", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Config.TIKTOK_BASE_URL = f"http://localhost:{server.server_address[1]}"
+    # El scroll debe llegar a todas las páginas de comentarios
+    Config.TIKTOK_MAX_SCROLLS = max(Config.TIKTOK_MAX_SCROLLS, args.comments // args.page_size + 1)
+    expected = args.videos * args.comments
+    print(f"Fixtures en {Config.TIKTOK_BASE_URL}: {args.videos} videos x {args.comments} comentarios, "
+          f"{args.delay:.2f} s por página")
+
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=True, executable_path=args.executable)
+            for parallelism in (int(p) for p in args.parallelism.split(",")):
+                Config.TIKTOK_TAB_PARALLELISM = parallelism
+                context = browser.new_context(viewport={"width": 1200, "height": 800})
+                page = context.new_page()
+                start = time.perf_counter()
+                comments = scrape_tiktok_page(page, "benchmark", args.videos)
+                elapsed = time.perf_counter() - start
+                context.close()
+                status = "ok" if len(comments) == expected else f"esperados {expected}"
+                print(f"{parallelism} pestaña(s): {elapsed:6.2f} s | {elapsed / args.videos:5.2f} s/video | "
+                      f"{len(comments)} comentarios ({status})")
+            browser.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Comprueba, con un cliente de OpenAI falso (sin red), cuántas llamadas hace
+OpenAIClient.analyze_sentiment_batch frente a una llamada por texto: empaquetado en lotes,
+textos repetidos, aciertos de caché y división del lote cuando la respuesta no se puede parsear.
+
+Uso: python -m app.Executable_Scripts.check_sentiment_batching [--texts 300]
+"""
+import argparse
+import json
+import re
+import sys
+from types import SimpleNamespace
+
+from app.OpenAIConfig.openai_client import MAX_BATCH_TOKENS, OpenAIClient
+
+BATCH_ITEMS_RE = re.compile(r"\n(\[.*\])$", re.DOTALL)
+
+
+class FakeCompletions:
+    """
+    Sustituye a client.chat.completions: responde en el formato que pide cada prompt
+    ("positivo" si el texto contiene "bien", "neutral" si no) y cuenta las llamadas.
+    :param broken_over: los lotes con más textos que esto reciben una respuesta sin JSON
+    """
+
+    def __init__(self, broken_over=None):
+        self.calls = 0
+        self.broken_over = broken_over
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        prompt = messages[-1]["content"]
+        match = BATCH_ITEMS_RE.search(prompt)
+        if match:
+            items = json.loads(match.group(1))
+            if self.broken_over is not None and len(items) > self.broken_over:
+                content = "Lo siento, no puedo procesar tantos textos."
+            else:
+                content = json.dumps([
+                    {"i": item["i"], "sentimiento": expected_sentiment(item["texto"]), "score": 0.5}
+                    for item in items
+                ])
+        else:
+            text = prompt.split("'")[1]
+            content = f"{expected_sentiment(text)}, 0.5"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class MemoryCache:
+    """Caché de sentimientos en memoria con la interfaz de SentimentCache."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get_many(self, model, texts):
+        return [self.data.get((model, text)) for text in texts]
+
+    def set_many(self, model, texts, results):
+        for text, result in zip(texts, results):
+            self.data[(model, text)] = tuple(result)
+
+    def get(self, model, text):
+        return self.data.get((model, text))
+
+    def set(self, model, text, result):
+        self.data[(model, text)] = tuple(result)
+
+
+def expected_sentiment(text):
+    return "positivo" if "bien" in text else "neutral"
+
+
+def make_client(cache=None, broken_over=None):
+    client = OpenAIClient(cache=cache, api_key="sin-red")
+    completions = FakeCompletions(broken_over)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client, completions
+
+
+def calls_with_splits(size, broken_over):
+    """Llamadas esperadas para un lote que se divide por la mitad mientras su respuesta falla."""
+    if size == 1 or size <= broken_over:
+        return 1
+    mid = size // 2
+    return 1 + calls_with_splits(mid, broken_over) + calls_with_splits(size - mid, broken_over)
+
+
+def make_texts(count):
+    return [f"comentario {i}: {'me parece bien' if i % 3 == 0 else 'sin opinion'}" for i in range(count)]
+
+
+def check(failures, name, condition, detail):
+    print(f"{'OK ' if condition else 'ERR'} {name}: {detail}")
+    if not condition:
+        failures.append(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=300)
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    expected = [(expected_sentiment(t), 0.5) for t in texts]
+    batch_sizes = [len(b) for b in OpenAIClient._pack_batches(texts, MAX_BATCH_TOKENS)]
+    failures = []
+
+    client, completions = make_client()
+    for text in texts:
+        client.analyze_sentiment(text)
+    single_calls = completions.calls
+    check(failures, "un texto por llamada", single_calls == len(texts), f"{single_calls} llamadas")
+
+    client, completions = make_client()
+    results = client.analyze_sentiment_batch(texts)
+    check(failures, "por lotes", completions.calls == len(batch_sizes) and results == expected,
+          f"{completions.calls} llamadas (lotes de {max(batch_sizes)} como máximo) frente a {single_calls}")
+
+    client, completions = make_client()
+    results = client.analyze_sentiment_batch(texts + texts[:50])
+    check(failures, "textos repetidos", completions.calls == len(batch_sizes) and results == expected + expected[:50],
+          f"{completions.calls} llamadas para {len(texts) + 50} textos")
+
+    cache = MemoryCache()
+    client, completions = make_client(cache=cache)
+    client.analyze_sentiment_batch(texts)
+    first = completions.calls
+    results = client.analyze_sentiment_batch(texts)
+    check(failures, "caché", completions.calls == first and results == expected,
+          f"{completions.calls - first} llamadas en la segunda pasada")
+
+    broken_over = 8
+    client, completions = make_client(broken_over=broken_over)
+    results = client.analyze_sentiment_batch(texts)
+    split_calls = sum(calls_with_splits(size, broken_over) for size in batch_sizes)
+    check(failures, "división al fallar el parseo", completions.calls == split_calls and results == expected,
+          f"{completions.calls} llamadas (esperadas {split_calls}) con respuestas inválidas por encima de "
+          f"{broken_over} textos")
+
+    client, completions = make_client(broken_over=0)
+    results = client.analyze_sentiment_batch(texts[:5])
+    check(failures, "división hasta textos sueltos", completions.calls == calls_with_splits(5, 0) and
+          results == expected[:5], f"{completions.calls} llamadas para 5 textos")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Servidor local que sustituye al scraper de Facebook (WebScrapper.exe) para pruebas.
+Sirve GET /facebook/search/<query> con los posts de all_posts.json que mencionan la búsqueda,
+enviando el array JSON post a post (opcionalmente con retardo) como haría el scraper real.
+
+Uso: python -m app.Executable_Scripts.facebook_standin [--port 8888] [--data all_posts.json] [--delay 0.5]
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep
+from urllib.parse import unquote
+
+SEARCH_PATH = "/facebook/search/"
+
+
+def matching_posts(posts, query):
+    """Posts cuyo título o comentarios contienen todas las palabras de la búsqueda."""
+    words = unquote(query).lower().replace("#", "").replace("@", "").split()
+    for post in posts:
+        haystack = " ".join(
+            [post.get("postTitle", "")] + [c.get("comment", "") for c in post.get("comments", [])]
+        ).lower()
+        if all(word in haystack for word in words):
+            yield post
+
+
+def make_handler(posts, delay):
+    class FacebookStandinHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if not self.path.startswith(SEARCH_PATH):
+                self.send_error(404)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            self.write_chunk("[")
+            for i, post in enumerate(matching_posts(posts, self.path[len(SEARCH_PATH):])):
+                if delay:
+                    sleep(delay)
+                self.write_chunk(("," if i else "") + json.dumps(post, ensure_ascii=False))
+            self.write_chunk("]")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def write_chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+    return FacebookStandinHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--data", default="all_posts.json")
+    parser.add_argument("--delay", type=float, default=0.0, help="segundos de espera antes de cada post")
+    args = parser.parse_args()
+
+    with open(args.data, encoding="utf-8") as f:
+        posts = json.load(f)
+
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(posts, args.delay))
+    print(f"Facebook stand-in en http://localhost:{args.port}{SEARCH_PATH}<query> ({len(posts)} posts)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,29 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import redis
 import json
+import time
+import uuid
+from collections import Counter
+from app.config import Config
+from app.RedisController.local_cache import get_read_cache
+from app.RedisController.redis_client import redis_client as r
+from app.services.fingerprint import content_fingerprint, dedup_text, simhash, simhash_bands
+from app.services.terms import tokenize
 
-# Connect to Redis (adjust host/port/db if needed)
-r = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+
+def cached_read(entry_key, loader, depends_on):
+    """Lectura a través de la caché local del proceso (si está activada); ver LocalReadCache.get."""
+    cache = get_read_cache()
+    if cache is None:
+        return loader()[0]
+    return cache.get(entry_key, loader, depends_on)
+
+
+def invalidate_local(*keys):
+    """Descarta ya en este proceso lo que dependa de claves recién escritas, sin esperar a la notificación."""
+    cache = get_read_cache()
+    if cache is not None:
+        cache.invalidate(*keys)
 
 
 class InfluencerRedis:
@@ -15,12 +35,13 @@ class InfluencerRedis:
             'name': name,
             'last_scrape': datetime.utcnow().isoformat()
         })
+        invalidate_local(key)
 
     @staticmethod
     def get(name):
-        """Retrieve influencer data."""
+        """Retrieve influencer data (cacheado en memoria hasta que cambie en Redis)."""
         key = f"influencer:{name}"
-        return r.hgetall(key)
+        return dict(cached_read(("influencer", name), lambda: (r.hgetall(key), ()), [key]))
 
     @staticmethod
     def get_all():
@@ -30,48 +51,708 @@ class InfluencerRedis:
     @staticmethod
     def exists(name):
         """Check if influencer exists."""
-        key = f"influencer:{name}"
-        return r.exists(key)
+        return 1 if InfluencerRedis.get(name) else 0
+
+    @staticmethod
+    def mark_scraped(name, platform):
+        """Guarda la hora (UTC) del último scrape completado de la plataforma."""
+        now = datetime.now(timezone.utc).isoformat()
+        r.hset(f"influencer:{name}", mapping={'name': name, 'last_scrape': now, f'last_scrape:{platform}': now})
+        invalidate_local(f"influencer:{name}")
+
+    @staticmethod
+    def get_scrape_time(name, platform):
+        """Epoch del último scrape completado de la plataforma, o None si no consta."""
+        value = InfluencerRedis.get(name).get(f"last_scrape:{platform}")
+        return datetime.fromisoformat(value).timestamp() if value else None
+
+    @staticmethod
+    def begin_refresh(name, platform, ttl):
+        """Marca un refresco en segundo plano en curso; False si ya hay uno (en cualquier proceso)."""
+        return bool(r.set(f"scrape_refreshing:{name}:{platform}", 1, nx=True, ex=ttl))
+
+    @staticmethod
+    def end_refresh(name, platform):
+        r.delete(f"scrape_refreshing:{name}:{platform}")
+
+# Versión de los índices derivados; subirla fuerza su reconstrucción perezosa
+INDEX_VERSION = 6
+SENTIMENTS = ("positivo", "negativo", "neutral")
+# Intentos de un recálculo de agregados que choca con escrituras concurrentes
+REBUILD_MAX_RETRIES = 5
+PLATFORMS = ("reddit", "tiktok", "facebook")
+# Sube la versión de la tabla de frecuencias y descuenta las palabras pendientes en un solo paso,
+# para que dos escrituras concurrentes no la suban dos veces ni dejen el contador negativo.
+# KEYS[1]: influencer_terms_meta; ARGV: WORDCLOUD_MIN_NEW_TERMS, WORDCLOUD_CHANGE_RATIO
+BUMP_TERMS_VERSION_LUA = """
+local pending = tonumber(redis.call('HGET', KEYS[1], 'pending') or 0)
+local total = tonumber(redis.call('HGET', KEYS[1], 'total') or 0)
+local threshold = math.max(tonumber(ARGV[1]), tonumber(ARGV[2]) * total)
+if pending > 0 and (pending >= threshold or pending == total) then
+    redis.call('HINCRBY', KEYS[1], 'version', 1)
+    redis.call('HINCRBY', KEYS[1], 'pending', -pending)
+    return 1
+end
+return 0
+"""
+
+
+def comment_timestamp(comment_data):
+    """Epoch (segundos) de la fecha del comentario; fechas sin zona se asumen UTC."""
+    date = comment_data.get("date")
+    try:
+        dt = datetime.fromisoformat(date)
+    except (TypeError, ValueError):
+        return time.time()
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
 
 class CommentRedis:
+    @staticmethod
+    def _index_comment(pipe, influencer_name, comment_id, comment_data):
+        """Encola en pipe las referencias del comentario en los índices del influencer."""
+        platform = comment_data.get("platform")
+        ts = comment_timestamp(comment_data)
+        pipe.sadd(f"influencer_comments:{influencer_name}", comment_id)
+        pipe.zadd(f"influencer_comments_by_date:{influencer_name}", {comment_id: ts})
+        if platform:
+            pipe.sadd(f"influencer_comments:{influencer_name}:{platform}", comment_id)
+            pipe.zadd(f"influencer_comments_by_date:{influencer_name}:{platform}", {comment_id: ts})
+        DedupRedis._register(pipe, influencer_name, platform, comment_id, dedup_text(comment_data))
+        if platform and comment_data.get("source_id"):
+            WatermarkRedis._mark(pipe, influencer_name, platform, [comment_data["source_id"]], ts)
+
+    @staticmethod
+    def _write_comment(pipe, influencer_name, comment_id, comment_data):
+        """
+        Encola en pipe el comentario y sus índices. Las repeticiones descartadas al deduplicar
+        ("duplicates") no se guardan en el comentario sino en influencer_references.
+        """
+        stored = {k: v for k, v in comment_data.items() if k != "duplicates"}
+        pipe.set(f"comment:{comment_id}", json.dumps(stored))
+        CommentRedis._index_comment(pipe, influencer_name, comment_id, comment_data)
+        if comment_data.get("duplicates"):
+            pipe.hincrby(f"influencer_references:{influencer_name}", comment_id, comment_data["duplicates"])
+
+    @staticmethod
+    def _weights(comments, weights=None):
+        """Veces que cuenta cada comentario en los agregados: él mismo más sus duplicados descartados."""
+        if weights is not None:
+            return weights
+        return [1 + int(comment_data.get("duplicates", 0)) for comment_data in comments]
+
+    @staticmethod
+    def _stats_deltas(influencer_name, comments, weights=None):
+        """
+        Agrupa los incrementos de agregados por clave: {stats_key: {campo: delta}}.
+        :param weights: veces que cuenta cada comentario (por defecto, ver _weights)
+        """
+        deltas = {}
+        for comment_data, weight in zip(comments, CommentRedis._weights(comments, weights)):
+            keys = [f"influencer_stats:{influencer_name}"]
+            if comment_data.get("platform"):
+                keys.append(f"influencer_stats:{influencer_name}:{comment_data['platform']}")
+            for key in keys:
+                d = deltas.setdefault(key, {"total": 0, "score_sum": 0.0, "score_count": 0})
+                d["total"] += weight
+                if comment_data.get("sentiment") in SENTIMENTS:
+                    d[comment_data["sentiment"]] = d.get(comment_data["sentiment"], 0) + weight
+                score = comment_data.get("score")
+                if isinstance(score, (int, float)) and not isinstance(score, bool):
+                    d["score_sum"] += score * weight
+                    d["score_count"] += weight
+        return deltas
+
+    @staticmethod
+    def _term_counts(comments, weights=None):
+        """Frecuencia de cada palabra en los comentarios, contando también sus duplicados descartados."""
+        counts = Counter()
+        for comment_data, weight in zip(comments, CommentRedis._weights(comments, weights)):
+            for word, n in Counter(tokenize(comment_data.get("text", ""))).items():
+                counts[word] += n * weight
+        return counts
+
+    @staticmethod
+    def _count_comments(pipe, influencer_name, comments, weights=None):
+        """Encola en pipe los incrementos de los agregados de sentimiento del influencer."""
+        for key, fields in CommentRedis._stats_deltas(influencer_name, comments, weights).items():
+            for field, delta in fields.items():
+                if field == "score_sum":
+                    pipe.hincrbyfloat(key, field, delta)
+                elif delta:
+                    pipe.hincrby(key, field, delta)
+
+    @staticmethod
+    def _count_terms(pipe, influencer_name, comments, weights=None):
+        """
+        Encola en pipe los incrementos de la tabla de frecuencias de palabras.
+        :return: True si se encoló alguna palabra
+        """
+        counts = CommentRedis._term_counts(comments, weights)
+        if not counts:
+            return False
+
+        for word, n in counts.items():
+            pipe.hincrby(f"influencer_terms:{influencer_name}", word, n)
+        added = sum(counts.values())
+        pipe.hincrby(f"influencer_terms_meta:{influencer_name}", "pending", added)
+        pipe.hincrby(f"influencer_terms_meta:{influencer_name}", "total", added)
+        return True
+
+    @staticmethod
+    def _maybe_bump_terms_version(influencer_name, added):
+        """
+        Sube la versión de la tabla de frecuencias solo si cambió de forma apreciable
+        (primera escritura o suficientes palabras nuevas respecto al total). La comprobación
+        se hace en Redis sobre los contadores actuales (ver BUMP_TERMS_VERSION_LUA).
+        """
+        if not added:
+            return
+        r.eval(BUMP_TERMS_VERSION_LUA, 1, f"influencer_terms_meta:{influencer_name}",
+               Config.WORDCLOUD_MIN_NEW_TERMS, Config.WORDCLOUD_CHANGE_RATIO)
+
+    @staticmethod
+    def _invalidate_written(influencer_name, comment_ids, comments):
+        """Descarta de la caché local las páginas afectadas por comentarios recién guardados."""
+        keys = {f"influencer_comments_by_date:{influencer_name}"}
+        keys.update(
+            f"influencer_comments_by_date:{influencer_name}:{c['platform']}" for c in comments if c.get("platform")
+        )
+        keys.update(f"comment:{comment_id}" for comment_id in comment_ids)
+        invalidate_local(*keys)
+
     @staticmethod
     def save_comment(comment_id, influencer_name, comment_data):
-        # Save the comment itself
-        r.set(f"comment:{comment_id}", json.dumps(comment_data))
+        pipe = r.pipeline()
+        # Save the comment itself and its references in the influencer's indexes (global, por plataforma y por fecha)
+        CommentRedis._write_comment(pipe, influencer_name, comment_id, comment_data)
+        CommentRedis._count_comments(pipe, influencer_name, [comment_data])
+        added = CommentRedis._count_terms(pipe, influencer_name, [comment_data])
+        pipe.execute()
+        CommentRedis._invalidate_written(influencer_name, [comment_id], [comment_data])
+        CommentRedis._maybe_bump_terms_version(influencer_name, added)
 
-        # Add reference to influencer's set of comments
-        r.sadd(f"influencer_comments:{influencer_name}", comment_id)
+    @staticmethod
+    def save_comments_bulk(influencer_name, comments, chunk_size=None):
+        """
+        Guarda un lote de comentarios, sus referencias en los índices del influencer
+        y los agregados (sentimiento y frecuencia de palabras) usando un pipeline transaccional por bloque
+        (un solo round trip por bloque).
+        :return: lista de ids generados, en el mismo orden que comments
+        """
+        chunk_size = chunk_size or Config.REDIS_PIPELINE_CHUNK_SIZE
+        comment_ids = []
+        for start in range(0, len(comments), chunk_size):
+            chunk = comments[start:start + chunk_size]
+            chunk_ids = [str(uuid.uuid4()) for _ in chunk]
+
+            pipe = r.pipeline()
+            for comment_id, comment_data in zip(chunk_ids, chunk):
+                CommentRedis._write_comment(pipe, influencer_name, comment_id, comment_data)
+            CommentRedis._count_comments(pipe, influencer_name, chunk)
+            added = CommentRedis._count_terms(pipe, influencer_name, chunk)
+            pipe.execute()
+            CommentRedis._invalidate_written(influencer_name, chunk_ids, chunk)
+            CommentRedis._maybe_bump_terms_version(influencer_name, added)
+
+            comment_ids.extend(chunk_ids)
+        return comment_ids
+
+    @staticmethod
+    def add_references(influencer_name, references):
+        """
+        Suma a comentarios ya guardados las repeticiones descartadas al deduplicar: {comment_id: n}.
+        Cada repetición cuenta en los agregados y en la tabla de frecuencias como el comentario original.
+        """
+        comment_ids = list(references)
+        if not comment_ids:
+            return
+        found, weights = [], []
+        pipe = r.pipeline()
+        for comment_id, comment_data in CommentRedis._get_comment_pairs(comment_ids):
+            found.append(comment_data)
+            weights.append(references[comment_id])
+            pipe.hincrby(f"influencer_references:{influencer_name}", comment_id, references[comment_id])
+        if not found:
+            return
+        CommentRedis._count_comments(pipe, influencer_name, found, weights)
+        added = CommentRedis._count_terms(pipe, influencer_name, found, weights)
+        pipe.execute()
+        CommentRedis._maybe_bump_terms_version(influencer_name, added)
+
+    @staticmethod
+    def _get_comment_pairs(comment_ids, chunk_size=None):
+        """Como get_comments_by_ids, pero devuelve pares (id, comentario)."""
+        chunk_size = chunk_size or Config.REDIS_PIPELINE_CHUNK_SIZE
+        comment_ids = list(comment_ids)
+        pairs = []
+        for start in range(0, len(comment_ids), chunk_size):
+            chunk_ids = comment_ids[start:start + chunk_size]
+            raws = r.mget([f"comment:{cid}" for cid in chunk_ids])
+            pairs.extend((cid, json.loads(raw)) for cid, raw in zip(chunk_ids, raws) if raw)
+        return pairs
 
     @staticmethod
     def get_comment(comment_id):
         data = r.get(f"comment:{comment_id}")
         return json.loads(data) if data else None
 
+    @staticmethod
+    def get_comments_by_ids(comment_ids, chunk_size=None):
+        """Lee comentarios con MGET por bloques; los ids sin comentario se omiten."""
+        chunk_size = chunk_size or Config.REDIS_PIPELINE_CHUNK_SIZE
+        comment_ids = list(comment_ids)
+        comments = []
+        for start in range(0, len(comment_ids), chunk_size):
+            keys = [f"comment:{cid}" for cid in comment_ids[start:start + chunk_size]]
+            comments.extend(json.loads(raw) for raw in r.mget(keys) if raw)
+        return comments
+
     @staticmethod
     def get_all_comments():
         keys = r.keys("comment:*")
-        return [json.loads(r.get(k)) for k in keys]
+        return CommentRedis.get_comments_by_ids(k.split(":", 1)[1] for k in keys)
 
     @staticmethod
     def get_comments_by_influencer(influencer_name):
         comment_ids = r.smembers(f"influencer_comments:{influencer_name}")
-        comments = []
-        for comment_id in comment_ids:
-            cid = comment_id.decode('utf-8') if isinstance(comment_id, bytes) else comment_id
-            if r.exists(f"comment:{cid}"):
-                comments.append(json.loads(r.get(f"comment:{cid}")))
-                print(f"[DEBUG] Tipo de comment_id: {type(comment_id)}, valor: {comment_id}")
-
-        return comments
+        return CommentRedis.get_comments_by_ids(comment_ids)
 
     @staticmethod
     def get_comments_by_influencer_and_platform(influencer_name, platform):
-        comment_ids = r.smembers(f"influencer_comments:{influencer_name}")
-        comments = []
-        for comment_id in comment_ids:
-            if r.exists(f"comment:{comment_id}"):
-                comment = json.loads(r.get(f"comment:{comment_id}"))
-                if comment.get("platform") == platform:
-                    comments.append(comment)
-        return comments
+        CommentRedis._ensure_indexes(influencer_name)
+        comment_ids = r.smembers(f"influencer_comments:{influencer_name}:{platform}")
+        return CommentRedis.get_comments_by_ids(comment_ids)
+
+    @staticmethod
+    def get_comments_page(influencer_name, platform=None, limit=None, cursor=None, since=None, until=None):
+        """
+        Devuelve comentarios del más reciente al más antiguo usando el índice por fecha.
+        :param limit: tamaño de página (None = todos los que cumplan el filtro)
+        :param cursor: valor opaco devuelto por la página anterior ("score:offset")
+        :param since: epoch mínimo (inclusive)
+        :param until: epoch máximo (inclusive)
+        :return: (comentarios, siguiente cursor o None)
+        """
+        CommentRedis._ensure_indexes(influencer_name)
+        key = f"influencer_comments_by_date:{influencer_name}"
+        if platform:
+            key = f"{key}:{platform}"
 
+        if limit is None:
+            comment_ids, _ = CommentRedis._page_ids(key, limit, cursor, since, until)
+            return CommentRedis.get_comments_by_ids(comment_ids), None
+
+        # Las páginas se cachean en memoria hasta que cambie el índice o alguno de sus comentarios
+        def load():
+            comment_ids, next_cursor = CommentRedis._page_ids(key, limit, cursor, since, until)
+            comments = CommentRedis.get_comments_by_ids(comment_ids)
+            return (comments, next_cursor), [f"comment:{cid}" for cid in comment_ids]
+
+        comments, next_cursor = cached_read(("comments_page", key, limit, cursor, since, until), load, [key])
+        return list(comments), next_cursor
+
+    @staticmethod
+    def _page_ids(key, limit, cursor, since, until):
+        """Ids de una página del índice por fecha y el cursor de la siguiente."""
+        max_score = "+inf" if until is None else until
+        offset = 0
+        if cursor:
+            cursor_score, offset = cursor.split(":")
+            max_score, offset = float(cursor_score), int(offset)
+            if until is not None:
+                max_score = min(max_score, until)
+        min_score = "-inf" if since is None else since
+
+        if limit is None:
+            entries = r.zrevrangebyscore(key, max_score, min_score, withscores=True)
+            return [cid for cid, _ in entries], None
+
+        # Se pide uno extra para saber si hay página siguiente
+        entries = r.zrevrangebyscore(key, max_score, min_score, start=offset, num=limit + 1, withscores=True)
+        page, has_more = entries[:limit], len(entries) > limit
+
+        next_cursor = None
+        if has_more and page:
+            last_score = page[-1][1]
+            same_score = sum(1 for _, score in page if score == last_score)
+            # Si toda la página comparte el score del cursor, el offset se acumula
+            if cursor and float(cursor.split(":")[0]) == last_score:
+                same_score += offset
+            next_cursor = f"{last_score!r}:{same_score}"
+
+        return [cid for cid, _ in page], next_cursor
+
+    @staticmethod
+    def _ensure_indexes(influencer_name):
+        """
+        Construye una única vez los índices derivados (por plataforma y por fecha)
+        para comentarios guardados antes de que existieran; las escrituras nuevas ya los mantienen.
+        """
+        flag = f"influencer_comments_indexed:{influencer_name}"
+        if int(cached_read(("indexed", influencer_name), lambda: (r.get(flag), ()), [flag]) or 0) >= INDEX_VERSION:
+            return
+
+        comment_ids = list(r.smembers(f"influencer_comments:{influencer_name}"))
+        chunk_size = Config.REDIS_PIPELINE_CHUNK_SIZE
+        for start in range(0, len(comment_ids), chunk_size):
+            chunk_ids = comment_ids[start:start + chunk_size]
+            raws = r.mget([f"comment:{cid}" for cid in chunk_ids])
+            pipe = r.pipeline()
+            for comment_id, raw in zip(chunk_ids, raws):
+                if raw:
+                    CommentRedis._index_comment(pipe, influencer_name, comment_id, json.loads(raw))
+            pipe.execute()
+        try:
+            CommentRedis.rebuild_stats(influencer_name)
+            CommentRedis.rebuild_terms(influencer_name)
+        except redis.WatchError as e:
+            # Sin marcar la versión: se reintenta en la siguiente lectura
+            print(e)
+            return
+        r.set(flag, INDEX_VERSION)
+        invalidate_local(flag)
+
+    @staticmethod
+    def get_stats(influencer_name, platform=None):
+        """
+        Agregados de sentimiento mantenidos en escritura (O(1)).
+        :return: dict con total, positive, negative, neutral y average_score
+        """
+        CommentRedis._ensure_indexes(influencer_name)
+        key = f"influencer_stats:{influencer_name}"
+        if platform:
+            key = f"{key}:{platform}"
+        raw = r.hgetall(key)
+        score_count = int(raw.get("score_count", 0))
+        return {
+            "total": int(raw.get("total", 0)),
+            "positive": int(raw.get("positivo", 0)),
+            "negative": int(raw.get("negativo", 0)),
+            "neutral": int(raw.get("neutral", 0)),
+            "average_score": float(raw.get("score_sum", 0.0)) / score_count if score_count else 0.0
+        }
+
+    @staticmethod
+    def _rebuild_watched(influencer_name, write):
+        """
+        Lee todos los comentarios del influencer y encola write(pipe, comments, weights) en una
+        transacción con WATCH sobre su índice y sus referencias (weights: veces que cuenta cada
+        comentario con sus duplicados). Si entre la lectura y la escritura se guarda algún
+        comentario o referencia (su incremento se perdería o contaría dos veces) se repite desde
+        la lectura; tras REBUILD_MAX_RETRIES intentos se lanza WatchError.
+        :return: lo que devuelva write
+        """
+        index_key = f"influencer_comments:{influencer_name}"
+        references_key = f"influencer_references:{influencer_name}"
+        for attempt in range(REBUILD_MAX_RETRIES):
+            with r.pipeline() as pipe:
+                try:
+                    pipe.watch(index_key, references_key)
+                    references = pipe.hgetall(references_key)
+                    pairs = CommentRedis._get_comment_pairs(pipe.smembers(index_key))
+                    comments = [comment_data for _, comment_data in pairs]
+                    weights = [1 + int(references.get(comment_id, 0)) for comment_id, _ in pairs]
+                    pipe.multi()
+                    result = write(pipe, comments, weights)
+                    pipe.execute()
+                    return result
+                except redis.WatchError:
+                    time.sleep(0.05 * (attempt + 1))
+        raise redis.WatchError(f"No se pudieron recalcular los agregados de {influencer_name}: escrituras concurrentes")
+
+    @staticmethod
+    def rebuild_stats(influencer_name):
+        """Recalcula desde cero los agregados del influencer a partir de los comentarios guardados."""
+        def write(pipe, comments, weights):
+            pipe.delete(f"influencer_stats:{influencer_name}")
+            for platform in PLATFORMS:
+                pipe.delete(f"influencer_stats:{influencer_name}:{platform}")
+            for key, fields in CommentRedis._stats_deltas(influencer_name, comments, weights).items():
+                pipe.hset(key, mapping=fields)
+            return len(comments)
+
+        return CommentRedis._rebuild_watched(influencer_name, write)
+
+    @staticmethod
+    def rebuild_terms(influencer_name):
+        """Recalcula desde cero la tabla de frecuencias de palabras del influencer."""
+        def write(pipe, comments, weights):
+            counts = CommentRedis._term_counts(comments, weights)
+            pipe.delete(f"influencer_terms:{influencer_name}")
+            if counts:
+                pipe.hset(f"influencer_terms:{influencer_name}", mapping=dict(counts))
+            pipe.hset(f"influencer_terms_meta:{influencer_name}",
+                      mapping={"pending": 0, "total": sum(counts.values())})
+            pipe.hincrby(f"influencer_terms_meta:{influencer_name}", "version", 1)
+            return len(counts)
+
+        return CommentRedis._rebuild_watched(influencer_name, write)
+
+    @staticmethod
+    def get_random_comments(influencer_name, count):
+        """Muestra aleatoria de comentarios sin leer todo el conjunto."""
+        comment_ids = r.srandmember(f"influencer_comments:{influencer_name}", count)
+        return CommentRedis.get_comments_by_ids(comment_ids)
+
+
+class DedupRedis:
+    """
+    Índices de deduplicación por influencer y plataforma: huella exacta -> id del comentario y
+    cubos de bandas SimHash para candidatos casi duplicados. Las repeticiones descartadas se
+    cuentan por comentario en influencer_references (ver CommentRedis.add_references).
+    """
+
+    @staticmethod
+    def _scope(influencer_name, platform):
+        """Parte común de las claves: cada plataforma deduplica solo contra sí misma."""
+        return f"{influencer_name}:{platform}" if platform else influencer_name
+
+    @staticmethod
+    def _register(pipe, influencer_name, platform, comment_id, text):
+        """Encola en pipe la huella y las bandas SimHash de un comentario guardado."""
+        fingerprint = content_fingerprint(text)
+        if fingerprint is None:
+            return
+        scope = DedupRedis._scope(influencer_name, platform)
+        pipe.hsetnx(f"influencer_fingerprints:{scope}", fingerprint, comment_id)
+        value = simhash(text)
+        if value is not None:
+            member = f"{comment_id}:{value:016x}"
+            for band, band_value in enumerate(simhash_bands(value)):
+                pipe.sadd(f"influencer_simhash:{scope}:{band}:{band_value:04x}", member)
+
+    @staticmethod
+    def get_comment_ids(influencer_name, platform, fingerprints):
+        """Id del comentario guardado para cada huella (None si no existe o la huella es None), en el mismo orden."""
+        CommentRedis._ensure_indexes(influencer_name)
+        fingerprints = list(fingerprints)
+        present = [fp for fp in fingerprints if fp is not None]
+        if not present:
+            return [None] * len(fingerprints)
+        stored = iter(r.hmget(f"influencer_fingerprints:{DedupRedis._scope(influencer_name, platform)}", present))
+        return [None if fp is None else next(stored) for fp in fingerprints]
+
+    @staticmethod
+    def get_simhash_candidates(influencer_name, platform, values):
+        """
+        Para cada SimHash (o None), los comentarios guardados que comparten alguna banda.
+        :return: lista alineada con values de listas [(comment_id, simhash)]
+        """
+        scope = DedupRedis._scope(influencer_name, platform)
+        values = list(values)
+        pipe = r.pipeline(transaction=False)
+        for value in values:
+            if value is not None:
+                for band, band_value in enumerate(simhash_bands(value)):
+                    pipe.smembers(f"influencer_simhash:{scope}:{band}:{band_value:04x}")
+        replies = iter(pipe.execute() if len(pipe) else [])
+
+        candidates = []
+        for value in values:
+            members = set()
+            if value is not None:
+                for _ in simhash_bands(value):
+                    members.update(next(replies))
+            candidates.append([(m.rsplit(":", 1)[0], int(m.rsplit(":", 1)[1], 16)) for m in members])
+        return candidates
+
+
+class WatermarkRedis:
+    """
+    Marcas de scraping incremental por influencer y plataforma: ids de origen ya procesados
+    (posts, comentarios, videos) y la fecha más reciente guardada.
+    """
+
+    @staticmethod
+    def _mark(pipe, influencer_name, platform, source_ids, ts=None):
+        """Encola en pipe los ids como vistos y, si hay fecha, avanza la marca (nunca retrocede)."""
+        if source_ids:
+            pipe.sadd(f"influencer_seen:{influencer_name}:{platform}", *source_ids)
+        if ts is not None:
+            pipe.zadd(f"influencer_watermarks:{influencer_name}", {platform: ts}, gt=True)
+
+    @staticmethod
+    def mark_seen(influencer_name, platform, source_ids):
+        source_ids = [sid for sid in source_ids if sid]
+        if source_ids:
+            pipe = r.pipeline()
+            WatermarkRedis._mark(pipe, influencer_name, platform, source_ids)
+            pipe.execute()
+
+    @staticmethod
+    def seen_flags(influencer_name, platform, source_ids):
+        """Lista de booleanos alineada con source_ids: True si ya se procesó."""
+        source_ids = list(source_ids)
+        if not source_ids:
+            return []
+        return [bool(flag) for flag in r.smismember(f"influencer_seen:{influencer_name}:{platform}", source_ids)]
+
+    @staticmethod
+    def get_since(influencer_name, platform):
+        """Epoch del contenido más reciente guardado para la plataforma, o None."""
+        return r.zscore(f"influencer_watermarks:{influencer_name}", platform)
+
+
+class WordCloudRedis:
+    @staticmethod
+    def get_version(influencer_name):
+        """Versión actual de la tabla de frecuencias (cambia solo con cambios apreciables)."""
+        CommentRedis._ensure_indexes(influencer_name)
+        return int(r.hget(f"influencer_terms_meta:{influencer_name}", "version") or 0)
+
+    @staticmethod
+    def get_frequencies(influencer_name, max_words=None):
+        """Las max_words palabras más frecuentes del influencer: {palabra: frecuencia}."""
+        counts = {word: int(n) for word, n in r.hgetall(f"influencer_terms:{influencer_name}").items()}
+        if max_words:
+            counts = dict(Counter(counts).most_common(max_words))
+        return counts
+
+    @staticmethod
+    def get_image(influencer_name, version):
+        """(PNG en base64, etag) cacheados para esa versión, o None si la imagen guardada es de otra."""
+        cached = r.hmget(f"wordcloud:{influencer_name}", "version", "png", "etag")
+        if cached[0] is None or int(cached[0]) != version:
+            return None
+        return cached[1], cached[2]
+
+    @staticmethod
+    def save_image(influencer_name, version, png_base64, etag):
+        """Guarda la imagen sin TTL; solo se conserva la de la última versión renderizada."""
+        r.hset(f"wordcloud:{influencer_name}", mapping={"version": version, "png": png_base64, "etag": etag})
+
+
+class ScrapeJobRedis:
+    """
+    Jobs de scraping asíncronos. La cola es una lista de Redis; el worker mueve cada id
+    a una lista de "en proceso" con BLMOVE para poder recuperarlo si se cae.
+    """
+    QUEUE_KEY = "scrape_jobs:queue"
+    PROCESSING_KEY = "scrape_jobs:processing"
+
+    @staticmethod
+    def enqueue(query, limit):
+        job_id = str(uuid.uuid4())
+        now = datetime.utcnow().isoformat()
+        mapping = {"id": job_id, "query": query, "limit": limit, "status": "queued",
+                   "created_at": now, "updated_at": now}
+        for platform in PLATFORMS:
+            mapping[f"{platform}:status"] = "pending"
+
+        pipe = r.pipeline()
+        pipe.hset(f"scrape_job:{job_id}", mapping=mapping)
+        pipe.expire(f"scrape_job:{job_id}", Config.SCRAPE_JOB_TTL)
+        pipe.lpush(ScrapeJobRedis.QUEUE_KEY, job_id)
+        pipe.execute()
+        return job_id
+
+    @staticmethod
+    def dequeue(timeout=5):
+        """Bloquea hasta `timeout` segundos esperando un job; devuelve su id o None."""
+        return r.blmove(ScrapeJobRedis.QUEUE_KEY, ScrapeJobRedis.PROCESSING_KEY, timeout, "RIGHT", "LEFT")
+
+    @staticmethod
+    def ack(job_id):
+        r.lrem(ScrapeJobRedis.PROCESSING_KEY, 0, job_id)
+
+    @staticmethod
+    def update(job_id, **fields):
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        r.hset(f"scrape_job:{job_id}", mapping={k: v for k, v in fields.items() if v is not None})
+
+    @staticmethod
+    def update_platform(job_id, platform, status, count=None, error=None):
+        ScrapeJobRedis.update(job_id, **{
+            f"{platform}:status": status,
+            f"{platform}:count": count,
+            f"{platform}:error": error
+        })
+
+    @staticmethod
+    def save_results(job_id, platform, comments):
+        key = f"scrape_job:{job_id}:results"
+        pipe = r.pipeline()
+        pipe.hset(key, platform, json.dumps(comments))
+        pipe.expire(key, Config.SCRAPE_JOB_TTL)
+        pipe.execute()
+
+    @staticmethod
+    def get(job_id):
+        """Estado del job con el progreso agrupado por plataforma, o None si no existe."""
+        raw = r.hgetall(f"scrape_job:{job_id}")
+        if not raw:
+            return None
+
+        job = {k: v for k, v in raw.items() if ":" not in k}
+        job["limit"] = int(job.get("limit", 0))
+        platforms = {}
+        for platform in PLATFORMS:
+            info = {"status": raw.get(f"{platform}:status", "pending")}
+            if f"{platform}:count" in raw:
+                info["count"] = int(raw[f"{platform}:count"])
+            if f"{platform}:error" in raw:
+                info["error"] = raw[f"{platform}:error"]
+            platforms[platform] = info
+        job["platforms"] = platforms
+
+        results = r.hgetall(f"scrape_job:{job_id}:results")
+        job["results"] = [c for platform in PLATFORMS for c in json.loads(results.get(platform, "[]"))]
+        return job
+
+    @staticmethod
+    def requeue_stale(max_age_seconds):
+        """
+        Devuelve a la cola los jobs "en proceso" cuyo worker dejó de dar señales
+        (sin actualizaciones en max_age_seconds). Devuelve cuántos se reencolaron.
+        """
+        requeued = 0
+        now = datetime.utcnow()
+        for job_id in r.lrange(ScrapeJobRedis.PROCESSING_KEY, 0, -1):
+            updated_at, status = r.hmget(f"scrape_job:{job_id}", "updated_at", "status")
+            if status in ("done", "failed"):
+                # Terminado, pero falló el ack: solo se descarta de la lista
+                r.lrem(ScrapeJobRedis.PROCESSING_KEY, 1, job_id)
+                continue
+            if updated_at and (now - datetime.fromisoformat(updated_at)).total_seconds() < max_age_seconds:
+                continue
+            # Si el job ya expiró solo se descarta de la lista
+            if r.lrem(ScrapeJobRedis.PROCESSING_KEY, 1, job_id) and updated_at:
+                r.rpush(ScrapeJobRedis.QUEUE_KEY, job_id)
+                requeued += 1
+        return requeued
+
+
+class ScrapeFlightRedis:
+    """
+    Lock por scrape en curso (mismo influencer, plataforma y parámetros) y su resultado,
+    guardado bajo el token del lock para que los que esperan lo lean aunque estén en otro proceso.
+    """
+
+    @staticmethod
+    def acquire(key, lease):
+        """Lock de redis-py con expiración `lease` segundos, o None si otro proceso ya lo tiene."""
+        lock = r.lock(f"scrape_flight:{key}", timeout=lease, blocking=False, thread_local=False)
+        return lock if lock.acquire() else None
+
+    @staticmethod
+    def token(lock):
+        token = lock.local.token
+        return token.decode() if isinstance(token, bytes) else token
+
+    @staticmethod
+    def holder(key):
+        """Token del lock vigente, o None si nadie lo tiene (terminó o expiró)."""
+        return r.get(f"scrape_flight:{key}")
+
+    @staticmethod
+    def save_result(key, token, comments=None, error=None):
+        payload = {"comments": comments} if error is None else {"error": error}
+        r.set(f"scrape_flight:{key}:result:{token}", json.dumps(payload), ex=Config.SCRAPE_FLIGHT_RESULT_TTL)
+
+    @staticmethod
+    def get_result(key, token):
+        raw = r.get(f"scrape_flight:{key}:result:{token}")
+        return json.loads(raw) if raw else None
@@ -1,23 +1,85 @@
 import os
-from flask import current_app
-from openai import OpenAI
+from flask import current_app, has_app_context
+from openai import APIConnectionError, InternalServerError, OpenAI, RateLimitError
 import re
+import json
+import random
+import time
+from app.config import Config
+from app.RedisController.sentiment_cache import sentiment_cache
+
+# Presupuesto aproximado de tokens de entrada por lote y máximo de textos por llamada
+MAX_BATCH_TOKENS = 2000
+MAX_BATCH_SIZE = 40
+SENTIMENTS = ('positivo', 'negativo', 'neutral')
+# Errores transitorios que se reintentan con backoff (APITimeoutError hereda de APIConnectionError)
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+def estimate_tokens(text):
+    """Estimación barata de tokens (~4 caracteres por token)."""
+    return len(text) // 4 + 1
 
 class OpenAIClient:
-    def __init__(self, model="gpt-3.5-turbo-16k"):
+    def __init__(self, model="gpt-3.5-turbo-16k", cache=sentiment_cache, api_key=None, limiter=None):
         self.model = model
-        api_key = current_app.config.get('OPENAI_API_KEY')
-        self.client = OpenAI(api_key=api_key)
+        if api_key is None:
+            api_key = current_app.config.get('OPENAI_API_KEY') if has_app_context() else Config.OPENAI_API_KEY
+        # Con limitador propio los reintentos (429, 5xx, timeouts) los gestiona _create_completion
+        self.client = OpenAI(api_key=api_key, max_retries=0) if limiter else OpenAI(api_key=api_key)
+        self.cache = cache
+        self.limiter = limiter
+
+    def _create_completion(self, messages, expected_output_tokens=50, **kwargs):
+        """
+        Llama a chat.completions respetando el limitador compartido (si hay) y reintentando
+        con backoff exponencial los 429, los 5xx, los timeouts y los errores de conexión.
+        """
+        prompt_tokens = sum(estimate_tokens(m['content']) for m in messages)
+        for attempt in range(Config.OPENAI_MAX_RETRIES + 1):
+            if self.limiter:
+                self.limiter.acquire(prompt_tokens + kwargs.get('max_tokens', expected_output_tokens))
+            try:
+                return self.client.chat.completions.create(model=self.model, messages=messages, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == Config.OPENAI_MAX_RETRIES:
+                    raise
+                response = getattr(e, 'response', None)
+                retry_after = response.headers.get('retry-after') if response is not None else None
+                try:
+                    delay = float(retry_after)
+                except (TypeError, ValueError):
+                    delay = min(Config.OPENAI_BACKOFF_MAX, Config.OPENAI_BACKOFF_BASE * 2 ** attempt)
+                delay += random.uniform(0, delay * 0.1)
+                print(f"OpenAI {type(e).__name__}, reintento {attempt + 1} en {delay:.1f}s")
+                # Un 429 frena a todo el proceso; los demás errores solo a esta llamada
+                if self.limiter and isinstance(e, RateLimitError):
+                    self.limiter.pause(delay)
+                else:
+                    time.sleep(delay)
 
     def analyze_sentiment(self, text):
+        if self.cache is not None:
+            cached = self.cache.get(self.model, text)
+            if cached is not None:
+                return cached
+
+        result = self._request_sentiment(text)
+        if result is None:
+            return 'neutral', 0.0
+        if self.cache is not None:
+            self.cache.set(self.model, text, result)
+        return result
+
+    def _request_sentiment(self, text):
+        """Clasifica un texto con una llamada. Devuelve None si falla o no se puede parsear."""
         prompt = (
             f"Clasifica el sentimiento de este texto: '{text}' "
             "como positivo, negativo o neutral, y devuelve solo el sentimiento "
             "y el puntaje entre -1 y 1, separados por coma. Ejemplo: positivo, 0.8"
         )
         try:
-            resp = self.client.chat.completions.create(
-                model=self.model,
+            resp = self._create_completion(
                 messages=[{'role': 'user', 'content': prompt}],
                 temperature=0
             )
@@ -32,16 +94,146 @@ class OpenAIClient:
                 return sentiment, score
             else:
                 print("No se pudo parsear la respuesta, retorno neutral")
-                return 'neutral', 0.0
+                return None
 
         except Exception as e:
             print(f"Error al analizar sentimiento: {e}")
-            return 'neutral', 0.0
-        
+            return None
+
+    def analyze_sentiment_batch(self, texts, max_batch_tokens=MAX_BATCH_TOKENS, map_fn=map, on_cache_hits=None):
+        """
+        Clasifica varios textos empaquetándolos en un solo prompt por lote.
+        Los textos ya vistos se sirven desde la caché y los repetidos se clasifican una vez.
+        :param texts: lista de textos a clasificar
+        :param max_batch_tokens: presupuesto aproximado de tokens de entrada por llamada
+        :param map_fn: función tipo map para repartir los lotes (p. ej. ThreadPoolExecutor.map)
+        :param on_cache_hits: callback(n) con cuántos textos se sirvieron desde la caché (se llama una vez)
+        :return: lista de tuplas (sentimiento, score) en el mismo orden que texts; None en los
+            textos que no se pudieron clasificar (error persistente de la API o respuesta ilegible)
+        """
+        texts = list(texts)
+        results = [None] * len(texts)
+        for indices, batch_results in self.iter_sentiment_batches(texts, max_batch_tokens, map_fn, on_cache_hits):
+            for i, result in zip(indices, batch_results):
+                results[i] = result
+        return results
+
+    def iter_sentiment_batches(self, texts, max_batch_tokens=MAX_BATCH_TOKENS, map_fn=map, on_cache_hits=None):
+        """
+        Igual que analyze_sentiment_batch, pero genera (índices, resultados) a medida que
+        se resuelven: primero los aciertos de caché y luego cada lote en el orden en que
+        map_fn lo entregue (puede ser por orden de finalización). Los textos que no se
+        pudieron clasificar llegan como None y no se cachean.
+        """
+        texts = list(texts)
+        if self.cache is not None:
+            cached = self.cache.get_many(self.model, texts)
+        else:
+            cached = [None] * len(texts)
+
+        hits = [i for i, r in enumerate(cached) if r is not None]
+        if on_cache_hits is not None:
+            on_cache_hits(len(hits))
+        if hits:
+            yield hits, [cached[i] for i in hits]
+
+        # Textos pendientes, sin repetir, en orden de aparición
+        positions = {}
+        for i, (text, result) in enumerate(zip(texts, cached)):
+            if result is None:
+                positions.setdefault(text, []).append(i)
+
+        batches = list(self._pack_batches(list(positions), max_batch_tokens))
+        for batch, batch_results in map_fn(lambda b: (b, self._analyze_batch(b)), batches):
+            ok = [(t, r) for t, r in zip(batch, batch_results) if r is not None]
+            if self.cache is not None and ok:
+                self.cache.set_many(self.model, [t for t, _ in ok], [r for _, r in ok])
+
+            indices, out = [], []
+            for text, result in zip(batch, batch_results):
+                for i in positions[text]:
+                    indices.append(i)
+                    out.append(result)
+            yield indices, out
+
+    @staticmethod
+    def _pack_batches(texts, max_batch_tokens):
+        batch, batch_tokens = [], 0
+        for text in texts:
+            # ~10 tokens extra por el envoltorio JSON de cada elemento
+            tokens = estimate_tokens(text) + 10
+            if batch and (batch_tokens + tokens > max_batch_tokens or len(batch) >= MAX_BATCH_SIZE):
+                yield batch
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+
+    def _analyze_batch(self, batch):
+        """Clasifica un lote; las posiciones que fallan quedan en None."""
+        if len(batch) == 1:
+            return [self._request_sentiment(batch[0])]
+
+        items = [{"i": i, "texto": text} for i, text in enumerate(batch)]
+        prompt = (
+            "Clasifica el sentimiento de cada texto de esta lista JSON como positivo, "
+            "negativo o neutral, con un puntaje entre -1 y 1. Devuelve solo un arreglo JSON "
+            "con un objeto por texto, en el mismo orden, con el formato "
+            '[{"i": 0, "sentimiento": "positivo", "score": 0.8}].\n'
+            f"{json.dumps(items, ensure_ascii=False)}"
+        )
+        try:
+            resp = self._create_completion(
+                messages=[{'role': 'user', 'content': prompt}],
+                expected_output_tokens=20 * len(batch),
+                temperature=0
+            )
+            content = resp.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"Error al analizar sentimiento en lote: {e}")
+            return [None] * len(batch)
+
+        parsed = self._parse_batch_response(content, len(batch))
+        if parsed is not None:
+            return parsed
+
+        # Respuesta incompleta o mal formada: dividir el lote y reintentar
+        print(f"No se pudo parsear el lote de {len(batch)} textos, dividiendo")
+        mid = len(batch) // 2
+        return self._analyze_batch(batch[:mid]) + self._analyze_batch(batch[mid:])
+
+    @staticmethod
+    def _parse_batch_response(content, expected):
+        match = re.search(r'\[.*\]', content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+        if not isinstance(data, list):
+            return None
+
+        by_index = {}
+        for entry in data:
+            try:
+                idx = int(entry["i"])
+                sentiment = str(entry["sentimiento"]).strip().lower()
+                score = float(entry["score"])
+            except (KeyError, TypeError, ValueError):
+                return None
+            if sentiment not in SENTIMENTS:
+                return None
+            by_index[idx] = (sentiment, max(-1.0, min(1.0, score)))
+
+        if sorted(by_index) != list(range(expected)):
+            return None
+        return [by_index[i] for i in range(expected)]
+
     def get_completion(self, prompt, temperature=0.7, max_tokens=1500):
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            response = self._create_completion(
                 messages=[
                     {"role": "system", "content": "Eres un experto en análisis de reputación digital."},
                     {"role": "user", "content": prompt}
@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from redis.exceptions import ResponseError
+
+from app.config import Config
+from app.RedisController.redis_client import redis_client
+
+# Clases de eventos necesarias: K (keyspace), g (DEL/EXPIRE/RENAME), $ (strings), h (hashes),
+# z (sorted sets), x (expirados) y e (desalojados)
+REQUIRED_EVENTS = "Kg$hzxe"
+# Prefijos de las claves cuyas lecturas se cachean en memoria
+WATCHED_PREFIXES = ("influencer:", "influencer_comments_by_date:", "influencer_comments_indexed:", "comment:")
+
+
+class LocalReadCache:
+    """
+    LRU en memoria para lecturas calientes de Redis. Cada entrada declara de qué claves de Redis
+    depende y se descarta cuando cualquiera de ellas cambia, avisado por las notificaciones de
+    keyspace que escucha un hilo propio. Sin notificaciones confirmadas no se cachea nada
+    (salvo que READ_CACHE_ASSUME_NOTIFICATIONS lo indique).
+    """
+
+    def __init__(self, max_entries, ttl, redis_conn=redis_client):
+        self.redis = redis_conn
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # clave de entrada -> (valor, claves de Redis de las que depende, instante de guardado)
+        self._entries = OrderedDict()
+        # clave de Redis -> claves de entrada que dependen de ella
+        self._dependents = {}
+        # Lecturas en curso (marca -> secuencia al empezar) y claves de Redis cambiadas desde
+        # entonces (clave -> secuencia del cambio), para no guardar un valor leído antes de un cambio
+        self._sequence = 0
+        self._loading = {}
+        self._changed = OrderedDict()
+        # Secuencia del último vaciado: lo leído antes no se guarda
+        self._cleared = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        self._listener_pid = None
+        self._active = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, entry_key, loader, depends_on):
+        """
+        Devuelve el valor cacheado o lo lee con loader() y lo guarda.
+        :param loader: función sin argumentos que lee de Redis; debe devolver (valor, claves extra)
+            con las claves de Redis que solo se conocen tras leer (p. ej. los comment:<id> de una página)
+        :param depends_on: claves de Redis conocidas de antemano
+        """
+        self._ensure_listener()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(entry_key) if self._active else None
+            if entry is not None and now - entry[2] <= self.ttl:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            marker = object()
+            started = self._loading[marker] = self._sequence
+
+        try:
+            value, extra_keys = loader()
+        except Exception:
+            with self._lock:
+                del self._loading[marker]
+            raise
+
+        with self._lock:
+            del self._loading[marker]
+            redis_keys = tuple(depends_on) + tuple(extra_keys)
+            # Si alguna dependencia cambió mientras se leía, el valor puede ser ya viejo
+            if self._active and started >= self._cleared and all(self._changed.get(k, -1) <= started for k in redis_keys):
+                self._store(entry_key, value, redis_keys, now)
+            self._prune_changes()
+        return value
+
+    def _prune_changes(self):
+        if not self._loading:
+            self._changed.clear()
+            return
+        oldest = min(self._loading.values())
+        while self._changed and next(iter(self._changed.values())) <= oldest:
+            self._changed.popitem(last=False)
+
+    def _store(self, entry_key, value, redis_keys, now):
+        self._discard(entry_key)
+        self._entries[entry_key] = (value, redis_keys, now)
+        for redis_key in redis_keys:
+            self._dependents.setdefault(redis_key, set()).add(entry_key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return
+        for redis_key in entry[1]:
+            dependents = self._dependents.get(redis_key)
+            if dependents is not None:
+                dependents.discard(entry_key)
+                if not dependents:
+                    del self._dependents[redis_key]
+
+    def invalidate(self, *redis_keys):
+        """Descarta las entradas que dependen de esas claves (también lo usan las escrituras locales)."""
+        with self._lock:
+            for redis_key in redis_keys:
+                self._sequence += 1
+                if self._loading:
+                    self._changed[redis_key] = self._sequence
+                    self._changed.move_to_end(redis_key)
+                for entry_key in self._dependents.pop(redis_key, ()):
+                    self._discard(entry_key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dependents.clear()
+            self._sequence += 1
+            self._cleared = self._sequence
+
+    def _ensure_listener(self):
+        # Un proceso hijo (fork) no hereda el hilo: arranca el suyo con la caché vacía
+        if self._listener_pid != os.getpid():
+            with self._lock:
+                if self._listener_pid != os.getpid():
+                    self._active = False
+                    self._entries.clear()
+                    self._dependents.clear()
+                    self._listener = threading.Thread(target=self._listen, daemon=True, name="read-cache-invalidator")
+                    self._listener_pid = os.getpid()
+                    self._listener.start()
+
+    def _enable_notifications(self):
+        """
+        True si el servidor emite las notificaciones necesarias (redis.conf). Sin poder comprobarlo
+        solo se cachea con READ_CACHE_ASSUME_NOTIFICATIONS, y solo se cambia la configuración del
+        servidor con READ_CACHE_CONFIGURE_NOTIFICATIONS.
+        """
+        try:
+            current = self.redis.config_get("notify-keyspace-events").get("notify-keyspace-events", "")
+        except ResponseError as e:
+            if Config.READ_CACHE_ASSUME_NOTIFICATIONS:
+                print("Caché local: no se pudo comprobar notify-keyspace-events; se asume activado")
+                return True
+            print(f"Caché local desactivada: no se pudo comprobar notify-keyspace-events ({e})")
+            return False
+        expanded = current.replace("A", "g$lshzxetd")
+        if all(flag in expanded for flag in REQUIRED_EVENTS):
+            return True
+        if not Config.READ_CACHE_CONFIGURE_NOTIFICATIONS:
+            print(f"Caché local desactivada: notify-keyspace-events debe incluir {REQUIRED_EVENTS}")
+            return False
+        try:
+            self.redis.config_set("notify-keyspace-events", "".join(sorted(set(current + REQUIRED_EVENTS))))
+            return True
+        except ResponseError as e:
+            print(f"Caché local desactivada: faltan notificaciones de keyspace ({e})")
+            return False
+
+    def _listen(self):
+        """Escucha las notificaciones; tras cada (re)conexión vacía la caché por si se perdió alguna."""
+        db = self.redis.connection_pool.connection_kwargs.get("db", 0)
+        channel_prefix = f"__keyspace@{db}__:"
+        while True:
+            pubsub = None
+            try:
+                if not self._enable_notifications():
+                    return
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(*(f"{channel_prefix}{prefix}*" for prefix in WATCHED_PREFIXES))
+                self.clear()
+                with self._lock:
+                    self._active = True
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "pmessage":
+                        self.invalidate(message["channel"][len(channel_prefix):])
+            except Exception as e:
+                print(f"Caché local: se perdió la suscripción a Redis ({e}); reintentando")
+                with self._lock:
+                    self._active = False
+                self.clear()
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "active": self._active,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "ttl_seconds": self.ttl
+            }
+
+
+_read_cache = None
+_read_cache_lock = threading.Lock()
+
+
+def get_read_cache():
+    """LocalReadCache compartida por el proceso, o None si READ_CACHE_ENABLED está desactivado."""
+    global _read_cache
+    if not Config.READ_CACHE_ENABLED:
+        return None
+    if _read_cache is None:
+        with _read_cache_lock:
+            if _read_cache is None:
+                _read_cache = LocalReadCache(Config.READ_CACHE_SIZE, Config.READ_CACHE_TTL)
+    return _read_cache
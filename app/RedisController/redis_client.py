@@ -1,9 +1,18 @@
 import redis
 from app.config import Config
 
-redis_client = redis.StrictRedis(
+# Pool único del proceso; los modelos, las cachés y los locks comparten estas conexiones.
+# Si se agotan, se espera REDIS_POOL_TIMEOUT segundos por una libre en vez de fallar.
+connection_pool = redis.BlockingConnectionPool(
     host=Config.REDIS_HOST,
     port=Config.REDIS_PORT,
     db=Config.REDIS_DB,
+    max_connections=Config.REDIS_MAX_CONNECTIONS,
+    timeout=Config.REDIS_POOL_TIMEOUT,
+    socket_connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+    socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+    health_check_interval=Config.REDIS_HEALTH_CHECK_INTERVAL,
     decode_responses=True
 )
+
+redis_client = redis.StrictRedis(connection_pool=connection_pool)
@@ -0,0 +1,54 @@
+import hashlib
+import unicodedata
+
+from app.config import Config
+from app.RedisController.redis_client import redis_client
+from app.RedisController.tiered_cache import TieredCache
+
+
+def normalize_text(text):
+    """Normaliza el texto para que variaciones triviales compartan entrada en caché."""
+    text = unicodedata.normalize('NFC', text or "")
+    return " ".join(text.lower().split())
+
+
+class SentimentCache(TieredCache):
+    """
+    Caché de sentimientos direccionada por contenido: hash(texto normalizado + modelo).
+    Tiene dos niveles: un LRU acotado en memoria y Redis con TTL.
+    """
+
+    def __init__(self, redis_conn=redis_client, ttl=None, max_local=None):
+        super().__init__(
+            "sentiment_cache",
+            ttl if ttl is not None else Config.SENTIMENT_CACHE_TTL,
+            max_local if max_local is not None else Config.SENTIMENT_CACHE_LRU_SIZE,
+            redis_conn
+        )
+
+    @staticmethod
+    def make_key(model, text):
+        digest = hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+        return f"{model}:{digest}"
+
+    def get_many(self, model, texts):
+        """Devuelve una lista alineada con texts: (sentimiento, score) o None si no está en caché."""
+        values = super().get_many(self.make_key(model, t) for t in texts)
+        return [tuple(v) if v is not None else None for v in values]
+
+    def set_many(self, model, texts, results):
+        """Guarda pares texto -> (sentimiento, score) en ambos niveles."""
+        super().set_many(
+            (self.make_key(model, text), [sentiment, score])
+            for text, (sentiment, score) in zip(texts, results)
+        )
+
+    def get(self, model, text):
+        return self.get_many(model, [text])[0]
+
+    def set(self, model, text, result):
+        self.set_many(model, [text], [result])
+
+
+# Instancia compartida por todo el proceso
+sentiment_cache = SentimentCache()
@@ -0,0 +1,93 @@
+import json
+import threading
+from collections import OrderedDict
+
+from app.RedisController.redis_client import redis_client
+
+
+class TieredCache:
+    """
+    Caché de dos niveles para valores JSON: un LRU acotado en memoria delante de Redis con TTL.
+    Lleva contadores de aciertos por nivel y de fallos.
+    """
+
+    def __init__(self, prefix, ttl, max_local, redis_conn=redis_client):
+        self.prefix = prefix
+        self.redis = redis_conn
+        self.ttl = ttl
+        self.max_local = max_local
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+
+    def _redis_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def _local_get(self, key):
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self._local.move_to_end(key)
+            return value
+
+    def _local_set(self, key, value):
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local:
+                self._local.popitem(last=False)
+
+    def get_many(self, keys):
+        """Devuelve una lista alineada con keys: el valor guardado o None si no está."""
+        keys = list(keys)
+        results = [self._local_get(k) for k in keys]
+
+        missing = [i for i, value in enumerate(results) if value is None]
+        if missing:
+            try:
+                stored = self.redis.mget([self._redis_key(keys[i]) for i in missing])
+            except Exception as e:
+                print(f"Error leyendo caché {self.prefix}: {e}")
+                stored = [None] * len(missing)
+            for i, raw in zip(missing, stored):
+                if raw:
+                    results[i] = json.loads(raw)
+                    self._local_set(keys[i], results[i])
+
+        redis_hits = sum(1 for i in missing if results[i] is not None)
+        misses = sum(1 for value in results if value is None)
+        with self._lock:
+            self.hits_local += len(keys) - len(missing)
+            self.hits_redis += redis_hits
+            self.misses += misses
+        return results
+
+    def set_many(self, items):
+        """Guarda pares (clave, valor) en ambos niveles."""
+        items = list(items)
+        if not items:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, value in items:
+                self._local_set(key, value)
+                pipe.set(self._redis_key(key), json.dumps(value), ex=self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Error guardando caché {self.prefix}: {e}")
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits_local + self.hits_redis
+            lookups = hits + self.misses
+            return {
+                "hits_local": self.hits_local,
+                "hits_redis": self.hits_redis,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "local_size": len(self._local),
+                "local_max_size": self.max_local,
+                "ttl_seconds": self.ttl
+            }
@@ -0,0 +1,144 @@
+import atexit
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+from playwright.sync_api import Error as PlaywrightError, sync_playwright
+
+from app.config import Config
+
+
+class _BrowserSlot(threading.Thread):
+    """
+    Un contexto persistente de Chromium con su propio perfil. La API síncrona de Playwright
+    solo puede usarse desde el hilo que la creó, así que cada slot vive en su hilo y
+    ejecuta ahí las tareas que recibe de la cola del pool.
+    """
+
+    def __init__(self, pool, index):
+        super().__init__(daemon=True, name=f"browser-slot-{index}")
+        self.pool = pool
+        self.profile_dir = os.path.join(Config.TIKTOK_PROFILE_DIR, f"pool-{index}")
+        self.context = None
+        self.uses = 0
+        self.closed = threading.Event()
+
+    def _launch(self, playwright):
+        options = dict(headless=Config.TIKTOK_HEADLESS, viewport={"width": 1200, "height": 800})
+        try:
+            context = playwright.chromium.launch_persistent_context(user_data_dir=self.profile_dir, **options)
+        except PlaywrightError as e:
+            # Perfil bloqueado por otro proceso (p. ej. el worker): usar uno temporal
+            print(f"No se pudo abrir el perfil {self.profile_dir} ({e}), usando uno temporal")
+            context = playwright.chromium.launch_persistent_context(user_data_dir=tempfile.mkdtemp(), **options)
+
+        self.closed.clear()
+        context.on("close", lambda _: self.closed.set())
+        # Cerrar la pestaña inicial; cada tarea abre la suya
+        for page in context.pages:
+            page.close()
+        self.context, self.uses = context, 0
+
+    def _recycle(self):
+        if self.context is not None:
+            try:
+                self.context.close()
+            except Exception:
+                pass
+        self.context = None
+
+    def _is_crash(self, error):
+        message = str(error).lower()
+        return self.closed.is_set() or "closed" in message or "crash" in message
+
+    def run(self):
+        with sync_playwright() as playwright:
+            while True:
+                if self.context is None:
+                    try:
+                        self._launch(playwright)
+                    except Exception as e:
+                        print(f"Error lanzando Chromium: {e}")
+                        time.sleep(5)
+                        continue
+
+                task = self.pool.tasks.get()
+                if task is None:
+                    break
+                fn, future = task
+                # Cancelada por timeout mientras esperaba en la cola: nadie espera su resultado
+                if not future.set_running_or_notify_cancel():
+                    continue
+
+                page = None
+                crashed = False
+                try:
+                    page = self.context.new_page()
+                    future.set_result(fn(page))
+                except Exception as e:
+                    crashed = isinstance(e, PlaywrightError) and self._is_crash(e)
+                    future.set_exception(e)
+                finally:
+                    if page is not None and not crashed:
+                        try:
+                            page.close()
+                        except Exception:
+                            crashed = True
+
+                self.uses += 1
+                if crashed or self.uses >= Config.TIKTOK_CONTEXT_MAX_USES:
+                    self._recycle()
+
+            self._recycle()
+
+
+class BrowserPool:
+    """Pool de contextos de Chromium ya lanzados; cada tarea recibe una pestaña nueva."""
+
+    def __init__(self, size=None):
+        self.tasks = queue.Queue()
+        self.slots = [_BrowserSlot(self, i) for i in range(size or Config.TIKTOK_BROWSER_POOL_SIZE)]
+        for slot in self.slots:
+            slot.start()
+
+    def run(self, fn, timeout=None):
+        """
+        Ejecuta fn(page) en el primer contexto libre y devuelve su resultado. Si se agota
+        timeout la tarea se cancela: si aún no había empezado ningún slot la ejecuta; si ya
+        estaba en marcha no se puede interrumpir desde otro hilo y termina por sus propios timeouts.
+        """
+        future = Future()
+        self.tasks.put((fn, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self):
+        for _ in self.slots:
+            self.tasks.put(None)
+        for slot in self.slots:
+            slot.join(timeout=10)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """
+    Devuelve el pool global; la primera llamada lanza (en segundo plano) los contextos. La app
+    y el worker la hacen al arrancar (TIKTOK_BROWSER_POOL_WARM) para que el primer scrape no
+    pague el arranque de Chromium.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.close)
+    return _pool
@@ -1,20 +1,105 @@
+import codecs
+import json
+import threading
 import requests
 from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.config import Config
+
+# Bytes leídos por iteración de la respuesta en streaming
+STREAM_CHUNK_SIZE = 16 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Sesión HTTP compartida (keep-alive) con reintentos y backoff ante errores de conexión y 5xx."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=Config.FACEBOOK_MAX_RETRIES,
+                    backoff_factor=0.5,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET"])
+                )
+                session = requests.Session()
+                session.mount("http://", HTTPAdapter(max_retries=retry, pool_maxsize=8))
+                _session = session
+    return _session
+
+
+def iter_json_array(chunks):
+    """
+    Genera los elementos de un array JSON a medida que llegan sus fragmentos de texto,
+    sin esperar al documento completo.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = finished = False
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("La respuesta no es un array JSON")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                finished = True
+                break
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # elemento incompleto: esperar al siguiente fragmento
+            if buffer[pos] not in '{["' and (end == len(buffer) or buffer[end] not in " \t\r\n,]"):
+                # Un número o literal solo está completo cuando le sigue un separador: puede
+                # continuar en el siguiente fragmento ("1" + "23", "-1.5e" + "3")
+                break
+            yield item
+            pos = end
+        if finished:
+            return
+
+    if not finished:
+        raise ValueError("Array JSON incompleto")
+
 
 class FacebookScraper:
-    def __init__(self, port: int = 8888):
-        self.port = port
-        self.base_url = f"http://localhost:{port}/facebook/search/"
+    def __init__(self, port: int = None):
+        self.port = port or Config.FACEBOOK_SCRAPER_PORT
+        self.base_url = f"http://localhost:{self.port}/facebook/search/"
 
-    def search(self, query: str):
+    def iter_posts(self, query: str):
+        """Genera los posts (con sus comentarios) según los va enviando el servicio local."""
         encoded_query = quote(query)
         full_url = self.base_url + encoded_query
         print(f"Sending search request: {full_url}")
 
-        try:
-            response = requests.get(full_url)
+        with get_session().get(
+            full_url,
+            stream=True,
+            timeout=(Config.FACEBOOK_CONNECT_TIMEOUT, Config.FACEBOOK_READ_TIMEOUT)
+        ) as response:
             response.raise_for_status()
-            return response.json()
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            chunks = (decoder.decode(raw) for raw in response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+            yield from iter_json_array(chunks)
+
+    def search(self, query: str):
+        try:
+            return list(self.iter_posts(query))
         except Exception as e:
             print(f"Failed to fetch results: {e}")
             return []
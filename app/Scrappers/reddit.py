@@ -1,53 +1,255 @@
+import math
+import queue
+import threading
 import praw
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import current_app
-from app.services.cleaner import TextCleaner
+from app.config import Config
+from app.RedisController.tiered_cache import TieredCache
+from app.services.parallel_cleaner import limpiar_textos
+
+# /api/user_data_by_account_ids acepta hasta 100 fullnames por llamada
+AUTHOR_BATCH_SIZE = 100
+# Resultados por página de los listados de búsqueda
+SEARCH_PAGE_SIZE = 100
+
+author_cache = TieredCache("reddit_author", Config.REDDIT_AUTHOR_CACHE_TTL, Config.REDDIT_AUTHOR_CACHE_LRU_SIZE)
+
+def reddit_credentials():
+    """(client_id, client_secret, user_agent) de la configuración de la app actual."""
+    return (
+        current_app.config.get("REDDIT_CLIENT_ID"),
+        current_app.config.get("REDDIT_CLIENT_SECRET"),
+        current_app.config.get("REDDIT_USER_AGENT")
+    )
+
+
+class RedditClientPool:
+    """
+    Clientes de PRAW de larga vida compartidos por todo el proceso. PRAW no es thread-safe
+    (sesión y limitador de peticiones internos), así que cada cliente lo usa un solo hilo a
+    la vez: se toma del pool para una llamada y se devuelve al terminar. Se crean como mucho
+    `size` clientes en toda la vida del proceso, así que el token OAuth se pide una vez por
+    cliente y no por cada hilo o petición.
+    """
+
+    def __init__(self, size):
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self, credentials=None):
+        """
+        Presta un cliente libre (o crea uno si aún no hay `size`); si todos están ocupados espera.
+        :param credentials: credenciales a usar fuera del contexto de la app (hilos de un executor)
+        """
+        try:
+            client = self._idle.get_nowait()
+        except queue.Empty:
+            client = self._create(credentials) or self._idle.get()
+        try:
+            yield client
+        finally:
+            self._idle.put(client)
+
+    def _create(self, credentials):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            client_id, client_secret, user_agent = credentials or reddit_credentials()
+            return praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+
+_client_pool = RedditClientPool(Config.REDDIT_COMMENT_WORKERS)
+# Hilos de búsqueda y de comentarios compartidos por todos los scrapes del proceso; con tantos
+# hilos como clientes en el pool ninguno espera por un cliente libre
+_executor = ThreadPoolExecutor(max_workers=max(1, Config.REDDIT_COMMENT_WORKERS), thread_name_prefix="reddit")
+
+
+def reddit_client(credentials=None):
+    """Context manager que presta un cliente de PRAW del pool del proceso (ver RedditClientPool)."""
+    return _client_pool.client(credentials)
+
+
+class ApiCallBudget:
+    """Contador de llamadas a la API de Reddit permitidas en una petición (compartido entre hilos)."""
+
+    def __init__(self, max_calls):
+        self.remaining = max_calls
+        self._lock = threading.Lock()
+
+    def spend(self, calls=1):
+        """Descuenta calls si quedan suficientes; devuelve False si el presupuesto no alcanza."""
+        with self._lock:
+            if self.remaining < calls:
+                return False
+            self.remaining -= calls
+            return True
+
+
+def submission_author_fullname(submission):
+    # vars() evita que PRAW haga un fetch perezoso si el post no trae el campo (autor borrado)
+    return vars(submission).get("author_fullname")
+
 
 class RedditScraper:
-    def __init__(self, keywords=None, limit=50):
+    def __init__(self, keywords=None, limit=50, fetch_comments=False, max_api_calls=None, since=None,
+                 is_seen=None):
+        """
+        :param fetch_comments: descargar también los comentarios top de cada post (una llamada por post)
+        :param max_api_calls: máximo de llamadas a la API en un scrape; los comentarios se omiten al agotarlo
+        :param since: epoch del post más reciente ya procesado; la búsqueda (por fecha) se corta al llegar a él
+        :param is_seen: callback(fullnames) -> [bool] para descartar posts ya procesados
+        """
         self.keywords = keywords or []
         self.limit = limit
-        self.reddit = praw.Reddit(
-            client_id=current_app.config.get("REDDIT_CLIENT_ID"),
-            client_secret=current_app.config.get("REDDIT_CLIENT_SECRET"),
-            user_agent=current_app.config.get("REDDIT_USER_AGENT")
-        )
+        self.fetch_comments = fetch_comments
+        self.since = since
+        self.is_seen = is_seen
+        self.budget = ApiCallBudget(max_api_calls if max_api_calls is not None else Config.REDDIT_MAX_API_CALLS)
+        # Los hilos del executor no tienen contexto de la app por si tienen que crear un cliente del pool
+        self.credentials = reddit_credentials()
+
+    def search(self, keyword):
+        """
+        Posts de r/all para keyword, del más nuevo al más antiguo, hasta llegar a contenido ya
+        procesado; cuesta una llamada por página de 100 resultados.
+        """
+        if not self.budget.spend(max(1, math.ceil(self.limit / SEARCH_PAGE_SIZE))):
+            print(f"Presupuesto de llamadas a Reddit agotado, se omite la búsqueda '{keyword}'")
+            return []
+        found = []
+        # El listado pide sus páginas al iterar: el cliente se retiene hasta terminar
+        with reddit_client(self.credentials) as reddit:
+            for submission in reddit.subreddit("all").search(keyword, limit=self.limit, sort='new'):
+                if self.since is not None and submission.created_utc < self.since:
+                    # Dejar de iterar evita pedir las páginas siguientes
+                    break
+                found.append((keyword, submission))
+        return found
+
+    def top_comments(self, submission):
+        """Pares (fullname, cuerpo sin limpiar) de los comentarios top de primer nivel, o [] sin presupuesto."""
+        if not self.budget.spend():
+            return []
+        try:
+            with reddit_client(self.credentials) as reddit:
+                # El post viene de otro cliente del pool: se vuelve a crear (sin pedirlo aún) con este
+                submission = reddit.submission(id=submission.id)
+                # Pedir solo los primeros comentarios en vez del árbol completo
+                submission.comment_sort = "top"
+                submission.comment_limit = Config.REDDIT_TOP_COMMENTS
+                submission.comments.replace_more(limit=0)
+                return [(c.fullname, c.body) for c in submission.comments[:Config.REDDIT_TOP_COMMENTS]]
+        except Exception as e:
+            print(f"Error obteniendo comentarios del post {submission.id}: {e}")
+            return []
+
+    def fetch_authors(self, fullnames):
+        """
+        Perfiles {fullname: {"link_karma", "created_utc"}} de los autores, primero desde la caché
+        y el resto en lotes de hasta 100 por llamada a la API.
+        """
+        fullnames = list(dict.fromkeys(f for f in fullnames if f))
+        profiles = {}
+        missing = []
+        for fullname, profile in zip(fullnames, author_cache.get_many(fullnames)):
+            if profile is None:
+                missing.append(fullname)
+            else:
+                profiles[fullname] = profile
+
+        fetched = {}
+        for start in range(0, len(missing), AUTHOR_BATCH_SIZE):
+            chunk = missing[start:start + AUTHOR_BATCH_SIZE]
+            if not self.budget.spend():
+                break
+            try:
+                with reddit_client(self.credentials) as reddit:
+                    for partial in reddit.redditors.partial_redditors(chunk):
+                        fetched[partial.fullname] = {
+                            "link_karma": getattr(partial, "link_karma", 0),
+                            "created_utc": getattr(partial, "created_utc", None)
+                        }
+            except Exception as e:
+                print(f"Error obteniendo autores de Reddit: {e}")
+                continue
+            # Cuentas suspendidas no vienen en la respuesta; se cachean vacías para no repetir la consulta
+            for fullname in chunk:
+                fetched.setdefault(fullname, {"link_karma": 0, "created_utc": None})
+
+        author_cache.set_many(fetched.items())
+        profiles.update(fetched)
+        return profiles
 
     def scrape(self):
+        submissions = [item for found in _executor.map(self.search, self.keywords) for item in found]
+        # La misma publicación puede salir en varias keywords
+        unique = {}
+        for keyword, submission in submissions:
+            unique.setdefault(submission.fullname, (keyword, submission))
+        submissions = list(unique.values())
+        if self.is_seen and submissions:
+            flags = self.is_seen([s.fullname for _, s in submissions])
+            submissions = [item for item, seen in zip(submissions, flags) if not seen]
+
+        authors = self.fetch_authors(submission_author_fullname(s) for _, s in submissions)
+
+        if self.fetch_comments:
+            comments_by_post = list(_executor.map(self.top_comments, (s for _, s in submissions)))
+        else:
+            comments_by_post = [[] for _ in submissions]
+
+        # Todos los textos del scrape se limpian en un solo lote, en este mismo orden
+        raw_texts = []
+        for (keyword, submission), comments in zip(submissions, comments_by_post):
+            raw_texts.extend([keyword, submission.title or "", submission.selftext or "",
+                              submission.link_flair_text or "", str(submission.author or "")])
+            raw_texts.extend(body for _, body in comments)
+        cleaned = iter(limpiar_textos(raw_texts))
+
         results = []
-        for keyword in self.keywords:
-            search_results = self.reddit.subreddit("all").search(keyword, limit=self.limit, sort='new')
-            for submission in search_results:
-                submission.comments.replace_more(limit=0)
-                comments = [TextCleaner.clean(c.body) for c in submission.comments.list()[:5]]
-
-                clean_title = TextCleaner.clean(submission.title or "")
-                clean_selftext = TextCleaner.clean(submission.selftext or "")
-
-                result = {
-                    "post_id": submission.id,
-                    "title": clean_title,
-                    "selftext": clean_selftext,
-                    "keyword": TextCleaner.clean(keyword),
-                    "score": submission.score,
-                    "upvote_ratio": submission.upvote_ratio,
-                    "num_comments": submission.num_comments,
-                    "is_original_content": submission.is_original_content,
-                    "link_flair_text": TextCleaner.clean(submission.link_flair_text or ""),
-                    "subreddit": submission.subreddit.display_name,
-                    "created_utc": datetime.utcfromtimestamp(submission.created_utc),
-                    "url": submission.url,
-                    "permalink": f"https://www.reddit.com{submission.permalink}",
-                    "author": TextCleaner.clean(str(submission.author)) if submission.author else "unknown",
-                    "author_karma": submission.author.link_karma if submission.author else 0,
-                    "author_created_utc": datetime.utcfromtimestamp(submission.author.created_utc) if submission.author else None,
-                    "top_comments": comments,
-                    # Análisis de sentimiento se añadirá después vía OpenAIClient
-                    "sentiment": None,
-                    "score_sentiment": None,
-                    "platform": "reddit"
-                }
-
-                results.append(result)
-
-        return results
\ No newline at end of file
+        for (keyword, submission), comments in zip(submissions, comments_by_post):
+            clean_keyword, clean_title, clean_selftext, clean_flair, clean_author = (next(cleaned) for _ in range(5))
+            clean_comments = [next(cleaned) for _ in comments]
+            author = authors.get(submission_author_fullname(submission)) if submission.author else None
+
+            result = {
+                "post_id": submission.id,
+                "title": clean_title,
+                "selftext": clean_selftext,
+                "keyword": clean_keyword,
+                "score": submission.score,
+                "upvote_ratio": submission.upvote_ratio,
+                "num_comments": submission.num_comments,
+                "is_original_content": submission.is_original_content,
+                "link_flair_text": clean_flair,
+                "subreddit": submission.subreddit.display_name,
+                "created_utc": datetime.utcfromtimestamp(submission.created_utc),
+                "url": submission.url,
+                "permalink": f"https://www.reddit.com{submission.permalink}",
+                "author": clean_author if submission.author else "unknown",
+                "author_karma": author["link_karma"] if author else 0,
+                "author_created_utc": datetime.utcfromtimestamp(author["created_utc"])
+                if author and author["created_utc"] else None,
+                "top_comments": clean_comments,
+                "top_comment_ids": [fullname for fullname, _ in comments],
+                # Análisis de sentimiento se añadirá después vía OpenAIClient
+                "sentiment": None,
+                "score_sentiment": None,
+                "platform": "reddit"
+            }
+
+            results.append(result)
+
+        return results
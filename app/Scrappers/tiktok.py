@@ -1,61 +1,166 @@
-from playwright.sync_api import sync_playwright
-import pandas as pd
-import time
+import hashlib
+import re
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from app.config import Config
+from app.Scrappers.browser_pool import get_browser_pool
 
-def scrape_tiktok(query: str, num_videos: int = 3):
-    comments_list = []
+VIDEO_LIST_SELECTOR = 'div[data-e2e="challenge-item-list"]'
+VIDEO_LINK_SELECTOR = 'div[id="column-item-video-container"] a[href*="/video/"]'
+TITLE_SELECTOR = 'span[data-e2e="new-desc-span"], [data-e2e="browse-video-desc"]'
+COMMENT_SELECTOR = 'p[data-e2e="comment-level-1"] span[dir]'
+# Endpoint JSON con el que TikTok pagina los comentarios de un video
+COMMENT_API_PATH = "/api/comment/list/"
+VIDEO_ID_RE = re.compile(r"/video/(\d+)")
+
+def scrape_tiktok(query: str, num_videos: int = 3, is_seen=None):
+    """
+    Scrapea comentarios de TikTok usando una pestaña de un contexto ya lanzado del pool.
+    :param is_seen: callback(ids) -> [bool] con los videos ("video:<id>") y comentarios ya procesados
+    """
+    return get_browser_pool().run(
+        lambda page: scrape_tiktok_page(page, query, num_videos, is_seen),
+        timeout=Config.TIKTOK_SCRAPE_TIMEOUT
+    )
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch_persistent_context(
-            user_data_dir="user_data",
-            headless=False,
-            viewport={"width": 1200, "height": 800}
-        )
+def video_id(video_url):
+    match = VIDEO_ID_RE.search(video_url)
+    return match.group(1) if match else video_url
 
-        page = browser.new_page()
+def scrape_tiktok_page(page, query: str, num_videos: int = 3, is_seen=None):
+    """
+    Abre el listado, toma las URLs de los primeros num_videos videos (primero los no vistos
+    en scrapes anteriores) y los procesa en pestañas paralelas (TIKTOK_TAB_PARALLELISM a la vez).
+    Las esperas dependen de selectores y no de pausas fijas.
+    """
+    base_url = Config.TIKTOK_BASE_URL
+    url = f"{base_url}/tag/{query}" if not query.startswith("@") else f"{base_url}/{query}"
+    page.goto(url, timeout=60000)
+    page.wait_for_selector(VIDEO_LIST_SELECTOR, timeout=20000)
 
-        url = f"https://www.tiktok.com/tag/{query}" if not query.startswith("@") else f"https://www.tiktok.com/{query}"
-        page.goto(url, timeout=60000)
-        time.sleep(3)
+    hrefs = page.eval_on_selector_all(VIDEO_LINK_SELECTOR, "els => els.map(e => e.href)")
+    video_urls = list(dict.fromkeys(hrefs))
+    if is_seen and video_urls:
+        flags = is_seen([f"video:{video_id(u)}" for u in video_urls])
+        video_urls = [u for u, seen in zip(video_urls, flags) if not seen] + \
+                     [u for u, seen in zip(video_urls, flags) if seen]
+    video_urls = video_urls[:num_videos]
+    if not video_urls:
+        print(f"TikTok: no se encontraron videos para {query}")
+        return []
 
-        page.wait_for_selector('div[data-e2e="challenge-item-list"]', timeout=20000)
-        videos = page.locator('div[id="column-item-video-container"]')
-        total = min(videos.count(), num_videos)
+    comments_list = []
+    parallelism = max(1, Config.TIKTOK_TAB_PARALLELISM)
+    for start in range(0, len(video_urls), parallelism):
+        wave = video_urls[start:start + parallelism]
 
-        for idx in range(total):
+        # Lanzar todas las navegaciones de la tanda; el navegador carga las pestañas en paralelo
+        tabs = []
+        for video_url in wave:
+            tab = page.context.new_page()
+            # Registrar la captura antes de navegar para no perder la primera página de comentarios
+            responses = []
+            tab.on("response", lambda response, captured=responses: capture_comment_response(captured, response))
             try:
-                videos.nth(idx).click()
-                time.sleep(4)
-
-                try:
-                    title = page.locator('span[data-e2e="new-desc-span"]').nth(0).inner_text()
-                except:
-                    title = "Sin título"
-
-                page.wait_for_selector('div[data-e2e="search-comment-container"]', timeout=10000)
-                for _ in range(5):
-                    page.mouse.wheel(0, 1200)
-                    time.sleep(1.2)
-
-                comments = page.locator('div[data-e2e="search-comment-container"] p[data-e2e="comment-level-1"] span[dir]')
-                for i in range(comments.count()):
-                    text = comments.nth(i).inner_text()
-                    comments_list.append({
-                        "query": query,
-                        "title": title,
-                        "text": text
-                    })
+                tab.goto(video_url, wait_until="commit", timeout=60000)
+            except Exception as e:
+                print(f"Error abriendo {video_url}: {e}")
+            tabs.append((video_url, tab, responses))
 
+        for video_url, tab, responses in tabs:
+            try:
+                comments_list.extend(scrape_video_tab(tab, query, video_url, responses, is_seen))
             except Exception as e:
-                print(f"Error en video {idx+1}: {e}")
-                continue
+                print(f"Error en video {video_url}: {e}")
+            finally:
+                tab.close()
+
+    return comments_list
+
+def capture_comment_response(captured, response):
+    # Solo se guarda la respuesta; el cuerpo se lee después, fuera del manejador de eventos
+    if COMMENT_API_PATH in response.url and response.ok:
+        captured.append(response)
+
+def scrape_video_tab(tab, query, video_url, responses, is_seen=None):
+    """
+    Espera a que carguen los comentarios, hace scroll mientras aparezcan nuevos (y no sean
+    ya conocidos) y los extrae: del JSON interceptado (modo "network") o, si no hay, con una
+    sola evaluación del DOM.
+    """
+    tab.wait_for_selector(COMMENT_SELECTOR, timeout=Config.TIKTOK_COMMENTS_TIMEOUT_MS)
+
+    try:
+        title = tab.locator(TITLE_SELECTOR).first.inner_text(timeout=2000)
+    except PlaywrightTimeoutError:
+        title = "Sin título"
+
+    scroll_until_stable(tab, responses, is_seen)
+
+    extracted = []
+    if Config.TIKTOK_COMMENT_EXTRACTION == "network":
+        extracted = comments_from_responses(responses)
+    if not extracted:
+        extracted = comments_from_dom(tab, video_url)
+
+    # Quitar repetidos (páginas solapadas de la API o re-renderizados)
+    unique = {}
+    for comment_id, text in extracted:
+        unique.setdefault(comment_id, text)
+    return [
+        {"query": query, "title": title, "text": text, "id": comment_id, "video_id": video_id(video_url)}
+        for comment_id, text in unique.items()
+    ]
+
+def comments_from_response(response):
+    """Pares (id, texto) de una respuesta JSON de la API de comentarios."""
+    try:
+        data = response.json()
+    except Exception as e:
+        print(f"No se pudo leer la respuesta de comentarios: {e}")
+        return []
+    return [
+        (str(comment["cid"]), comment["text"])
+        for comment in data.get("comments") or []
+        if comment.get("cid") and comment.get("text")
+    ]
+
+def comments_from_responses(responses):
+    """Pares (id, texto) de todas las respuestas JSON capturadas."""
+    return [pair for response in responses for pair in comments_from_response(response)]
 
-            if idx < total - 1:
-                page.go_back()
-                time.sleep(2)
-                page.wait_for_selector('div[data-e2e="challenge-item-list"]', timeout=10000)
-                videos = page.locator('div[id="column-item-video-container"]')
+def latest_page_seen(responses, is_seen):
+    """True si todos los comentarios de la última página recibida ya se procesaron antes."""
+    if not responses:
+        return False
+    ids = [comment_id for comment_id, _ in comments_from_response(responses[-1])]
+    return bool(ids) and all(is_seen(ids))
 
-        browser.close()
+def comments_from_dom(tab, video_url):
+    """Pares (id, texto) leídos del DOM en una sola evaluación; el id se deriva del video y el texto."""
+    texts = tab.eval_on_selector_all(COMMENT_SELECTOR, "els => els.map(e => e.innerText)")
+    return [
+        (hashlib.sha1(f"{video_url}\n{text}".encode("utf-8")).hexdigest(), text)
+        for text in texts if text
+    ]
 
-    return comments_list
\ No newline at end of file
+def scroll_until_stable(tab, responses=None, is_seen=None):
+    """
+    Hace scroll hasta que el número de comentarios deja de crecer (o TIKTOK_MAX_SCROLLS),
+    o hasta que la última página interceptada solo trae comentarios ya conocidos.
+    """
+    comments = tab.locator(COMMENT_SELECTOR)
+    count = comments.count()
+    for _ in range(Config.TIKTOK_MAX_SCROLLS):
+        if is_seen and latest_page_seen(responses, is_seen):
+            break
+        # Llevar el último comentario a la vista dispara la carga del siguiente bloque
+        comments.last.scroll_into_view_if_needed()
+        try:
+            tab.wait_for_function(
+                "([selector, previous]) => document.querySelectorAll(selector).length > previous",
+                arg=[COMMENT_SELECTOR, count],
+                timeout=Config.TIKTOK_SCROLL_WAIT_MS
+            )
+        except PlaywrightTimeoutError:
+            break
+        count = comments.count()
@@ -1,6 +1,7 @@
 from flask import Flask
 from app.API_Gateways.api_routes import api_bp
 from app.config import Config
+from app.commands import rebuild_stats_command, scrape_worker_command
 from flask_cors import CORS
 
 def create_app():
@@ -8,6 +9,10 @@ def create_app():
     app.config.from_object(Config)
     # Register the blueprint
     app.register_blueprint(api_bp)
-    CORS(app)
+    # Exponer cabeceras propias (paginación, caché) a los clientes del navegador
+    CORS(app, expose_headers=["X-Next-Cursor", "ETag", "X-Cache", "Age"])
+    # Comandos de mantenimiento (flask --app app:create_app <comando>)
+    app.cli.add_command(rebuild_stats_command)
+    app.cli.add_command(scrape_worker_command)
     
     return app
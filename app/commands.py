@@ -0,0 +1,32 @@
+import click
+from flask import current_app
+from app.Models.models import CommentRedis, InfluencerRedis
+from app.services.scrape_worker import run_worker
+
+
+@click.command("rebuild-stats")
+@click.argument("influencer_name", required=False)
+def rebuild_stats_command(influencer_name):
+    """
+    Recalcula los agregados (sentimiento y frecuencia de palabras) desde los comentarios guardados.
+    Uso: flask --app app:create_app rebuild-stats [INFLUENCER]
+    """
+    if influencer_name:
+        names = [influencer_name]
+    else:
+        names = [i["name"] for i in InfluencerRedis.get_all() if i.get("name")]
+
+    for name in names:
+        count = CommentRedis.rebuild_stats(name)
+        words = CommentRedis.rebuild_terms(name)
+        click.echo(f"{name}: {count} comentarios, {words} palabras distintas")
+
+
+@click.command("scrape-worker")
+@click.option("--concurrency", type=int, default=None, help="Jobs en paralelo (por defecto SCRAPE_WORKER_CONCURRENCY).")
+def scrape_worker_command(concurrency):
+    """
+    Procesa los jobs de POST /api/scrape/all con "async": true.
+    Uso: flask --app app:create_app scrape-worker --concurrency 2
+    """
+    run_worker(current_app._get_current_object(), concurrency)
@@ -1,12 +1,121 @@
 import os
 
 class Config:
-    REDIS_HOST = "localhost"
-    REDIS_PORT = 6379
-    REDIS_DB = 0
+    REDIS_HOST = os.getenv('REDIS_HOST', "localhost")
+    REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+    REDIS_DB = int(os.getenv('REDIS_DB', 0))
+    # Pool de conexiones compartido por todo el proceso: tamaño máximo, espera por una conexión
+    # libre y timeouts de socket (mayor que el bloqueo de BLMOVE de la cola de jobs)
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+    REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 20))
+    REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', 5))
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 30))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
 
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', 'dummy-api-key')
 
     REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
     REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
-    REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'karma_influencer_app/0.1')
\ No newline at end of file
+    REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'karma_influencer_app/0.1')
+
+    # Caché de sentimientos (Redis + LRU en memoria)
+    SENTIMENT_CACHE_TTL = int(os.getenv('SENTIMENT_CACHE_TTL', 7 * 24 * 3600))
+    SENTIMENT_CACHE_LRU_SIZE = int(os.getenv('SENTIMENT_CACHE_LRU_SIZE', 10000))
+
+    # Concurrencia y límites de la API de OpenAI (compartidos por todo el proceso)
+    OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', 8))
+    OPENAI_REQUESTS_PER_MINUTE = int(os.getenv('OPENAI_REQUESTS_PER_MINUTE', 3500))
+    OPENAI_TOKENS_PER_MINUTE = int(os.getenv('OPENAI_TOKENS_PER_MINUTE', 90000))
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', 5))
+    OPENAI_BACKOFF_BASE = float(os.getenv('OPENAI_BACKOFF_BASE', 1.0))
+    OPENAI_BACKOFF_MAX = float(os.getenv('OPENAI_BACKOFF_MAX', 30.0))
+
+    # Tamaño de bloque para escrituras en pipeline y lecturas con MGET
+    REDIS_PIPELINE_CHUNK_SIZE = int(os.getenv('REDIS_PIPELINE_CHUNK_SIZE', 500))
+
+    # Tamaño máximo de página en /api/comments/<influencer_name>
+    COMMENTS_PAGE_MAX_LIMIT = int(os.getenv('COMMENTS_PAGE_MAX_LIMIT', 500))
+
+    # Nube de palabras: palabras mostradas, umbral de cambio para re-renderizar y TTL del PNG
+    WORDCLOUD_MAX_WORDS = int(os.getenv('WORDCLOUD_MAX_WORDS', 100))
+    WORDCLOUD_MIN_NEW_TERMS = int(os.getenv('WORDCLOUD_MIN_NEW_TERMS', 50))
+    WORDCLOUD_CHANGE_RATIO = float(os.getenv('WORDCLOUD_CHANGE_RATIO', 0.05))
+
+    # Jobs de scraping asíncronos
+    SCRAPE_WORKER_CONCURRENCY = int(os.getenv('SCRAPE_WORKER_CONCURRENCY', 2))
+    SCRAPE_JOB_TTL = int(os.getenv('SCRAPE_JOB_TTL', 24 * 3600))
+    SCRAPE_JOB_STALE_SECONDS = int(os.getenv('SCRAPE_JOB_STALE_SECONDS', 30 * 60))
+    SCRAPE_JOB_REQUEUE_INTERVAL = int(os.getenv('SCRAPE_JOB_REQUEUE_INTERVAL', 60))
+
+    # Pool de navegadores para TikTok (TIKTOK_BASE_URL permite apuntar a fixtures locales)
+    TIKTOK_BASE_URL = os.getenv('TIKTOK_BASE_URL', 'https://www.tiktok.com').rstrip('/')
+    TIKTOK_BROWSER_POOL_SIZE = int(os.getenv('TIKTOK_BROWSER_POOL_SIZE', 2))
+    TIKTOK_BROWSER_POOL_WARM = os.getenv('TIKTOK_BROWSER_POOL_WARM', 'true').lower() not in ('0', 'false', 'no')
+    TIKTOK_CONTEXT_MAX_USES = int(os.getenv('TIKTOK_CONTEXT_MAX_USES', 20))
+    TIKTOK_HEADLESS = os.getenv('TIKTOK_HEADLESS', 'true').lower() not in ('0', 'false', 'no')
+    TIKTOK_PROFILE_DIR = os.getenv('TIKTOK_PROFILE_DIR', 'user_data')
+    TIKTOK_SCRAPE_TIMEOUT = int(os.getenv('TIKTOK_SCRAPE_TIMEOUT', 300))
+    TIKTOK_TAB_PARALLELISM = int(os.getenv('TIKTOK_TAB_PARALLELISM', 3))
+    TIKTOK_COMMENTS_TIMEOUT_MS = int(os.getenv('TIKTOK_COMMENTS_TIMEOUT_MS', 10000))
+    TIKTOK_SCROLL_WAIT_MS = int(os.getenv('TIKTOK_SCROLL_WAIT_MS', 2500))
+    TIKTOK_MAX_SCROLLS = int(os.getenv('TIKTOK_MAX_SCROLLS', 10))
+    # "network": JSON interceptado de la API de comentarios (con respaldo en el DOM); "dom": solo DOM
+    TIKTOK_COMMENT_EXTRACTION = os.getenv('TIKTOK_COMMENT_EXTRACTION', 'network')
+
+    # Caché de perfiles de autores de Reddit (karma y fecha de creación)
+    REDDIT_AUTHOR_CACHE_TTL = int(os.getenv('REDDIT_AUTHOR_CACHE_TTL', 24 * 3600))
+    REDDIT_AUTHOR_CACHE_LRU_SIZE = int(os.getenv('REDDIT_AUTHOR_CACHE_LRU_SIZE', 5000))
+
+    # Reddit: comentarios top opcionales, hilos para descargarlos y presupuesto de llamadas por petición
+    REDDIT_TOP_COMMENTS = int(os.getenv('REDDIT_TOP_COMMENTS', 5))
+    REDDIT_COMMENT_WORKERS = int(os.getenv('REDDIT_COMMENT_WORKERS', 4))
+    REDDIT_MAX_API_CALLS = int(os.getenv('REDDIT_MAX_API_CALLS', 60))
+
+    # Limpieza de texto en paralelo: procesos del pool y tamaño mínimo de lote para usarlo
+    CLEANER_PROCESSES = int(os.getenv('CLEANER_PROCESSES', os.cpu_count() or 1))
+    CLEANER_PARALLEL_THRESHOLD = int(os.getenv('CLEANER_PARALLEL_THRESHOLD', 5000))
+
+    # Clasificador léxico local: solo los textos con confianza menor al umbral van al LLM
+    SENTIMENT_LEXICON_ENABLED = os.getenv('SENTIMENT_LEXICON_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    SENTIMENT_LEXICON_THRESHOLD = float(os.getenv('SENTIMENT_LEXICON_THRESHOLD', 0.6))
+
+    # Deduplicación antes del análisis: distancia de Hamming máxima entre SimHash (<= 3 con 4 bandas)
+    DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    DEDUP_MAX_DISTANCE = int(os.getenv('DEDUP_MAX_DISTANCE', 3))
+
+    # Scraper local de Facebook: puerto, timeouts (conexión/lectura), reintentos y tamaño de lote para analizar
+    FACEBOOK_SCRAPER_PORT = int(os.getenv('FACEBOOK_SCRAPER_PORT', 8888))
+    FACEBOOK_CONNECT_TIMEOUT = float(os.getenv('FACEBOOK_CONNECT_TIMEOUT', 3))
+    FACEBOOK_READ_TIMEOUT = float(os.getenv('FACEBOOK_READ_TIMEOUT', 60))
+    FACEBOOK_MAX_RETRIES = int(os.getenv('FACEBOOK_MAX_RETRIES', 3))
+    FACEBOOK_ANALYSIS_BATCH = int(os.getenv('FACEBOOK_ANALYSIS_BATCH', 50))
+
+    # Caché de /api/scrape/<plataforma>: TTL por plataforma (segundos) y margen en el que se sirve
+    # el resultado caducado mientras se refresca en segundo plano
+    SCRAPE_CACHE_TTL = {
+        "reddit": int(os.getenv('SCRAPE_CACHE_TTL_REDDIT', 15 * 60)),
+        "tiktok": int(os.getenv('SCRAPE_CACHE_TTL_TIKTOK', 60 * 60)),
+        "facebook": int(os.getenv('SCRAPE_CACHE_TTL_FACEBOOK', 60 * 60)),
+    }
+    SCRAPE_CACHE_STALE_SECONDS = int(os.getenv('SCRAPE_CACHE_STALE_SECONDS', 24 * 3600))
+    SCRAPE_REFRESH_TIMEOUT = int(os.getenv('SCRAPE_REFRESH_TIMEOUT', 600))
+
+    # Scrapes coalescidos: vida del lock (se renueva mientras el scrape sigue vivo), espera máxima
+    # de quienes se suman a un scrape en curso y cuánto se conserva su resultado compartido
+    SCRAPE_FLIGHT_LEASE = int(os.getenv('SCRAPE_FLIGHT_LEASE', 30))
+    SCRAPE_FLIGHT_WAIT_TIMEOUT = int(os.getenv('SCRAPE_FLIGHT_WAIT_TIMEOUT', 15 * 60))
+    SCRAPE_FLIGHT_RESULT_TTL = int(os.getenv('SCRAPE_FLIGHT_RESULT_TTL', 120))
+
+    # Caché local de lecturas (metadatos de influencers y páginas de comentarios), invalidada con
+    # notificaciones de keyspace; el TTL solo acota lo que podría durar una entrada si se pierde alguna
+    READ_CACHE_ENABLED = os.getenv('READ_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    READ_CACHE_SIZE = int(os.getenv('READ_CACHE_SIZE', 2000))
+    READ_CACHE_TTL = int(os.getenv('READ_CACHE_TTL', 300))
+    # notify-keyspace-events se configura en redis.conf. Opcionales: cachear aunque no se pueda
+    # comprobar (CONFIG deshabilitado en Redis gestionado) o activarlo en el servidor si falta
+    READ_CACHE_ASSUME_NOTIFICATIONS = (
+        os.getenv('READ_CACHE_ASSUME_NOTIFICATIONS', 'false').lower() in ('1', 'true', 'yes')
+    )
+    READ_CACHE_CONFIGURE_NOTIFICATIONS = (
+        os.getenv('READ_CACHE_CONFIGURE_NOTIFICATIONS', 'false').lower() in ('1', 'true', 'yes')
+    )
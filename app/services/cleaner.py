@@ -1,6 +1,108 @@
 import re
+import string
 import unicodedata
 
+# Patrones compilados una sola vez por proceso
+EMOJI_RE = re.compile(
+    "["
+    u"\U0001F600-\U0001F64F"
+    u"\U0001F300-\U0001F5FF"
+    u"\U0001F680-\U0001F6FF"
+    u"\U0001F1E0-\U0001F1FF"
+    u"\U00002500-\U00002BEF"
+    u"\U00002702-\U000027B0"
+    u"\U000024C2-\U0001F251"
+    u"\U0001f926-\U0001f937"
+    u"\U00010000-\U0010ffff"
+    u"\u2640-\u2642"
+    u"\u2600-\u2B55"
+    u"\u200d"
+    u"\u23cf"
+    u"\u23e9"
+    u"\u231a"
+    u"\ufe0f"
+    u"\u3030"
+    "]+",
+    flags=re.UNICODE
+)
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s]')
+WORD_OR_SPACE_RE = re.compile(r'[\w\s]')
+MARKDOWN_LINK_RE = re.compile(r'\[.*?\]\(.*?\)')
+URL_RE = re.compile(r'http\S+|www\.\S+|\S+\.com\S*|\S+\.org\S*|\S+\.net\S*', flags=re.IGNORECASE)
+DOMAIN_RE = re.compile(r'\S+\.(io|co|ai|tv|gov|edu)\S*', flags=re.IGNORECASE)
+
+
+class TranslationTable(dict):
+    """
+    Tabla para str.translate que calcula el reemplazo de cada carácter la primera vez que
+    aparece y lo memoriza; así el coste por carácter distinto se paga una sola vez.
+    """
+
+    def __init__(self, char_fn):
+        super().__init__()
+        self.char_fn = char_fn
+
+    def __missing__(self, codepoint):
+        replacement = self.char_fn(chr(codepoint))
+        self[codepoint] = replacement
+        return replacement
+
+
+def _clean_char(char):
+    # Mismo orden que los pasos originales: emojis, acentos (NFKD) y caracteres especiales
+    if EMOJI_RE.match(char):
+        return ''
+    return ''.join(
+        c for c in unicodedata.normalize('NFKD', char)
+        if not unicodedata.combining(c) and WORD_OR_SPACE_RE.match(c)
+    )
+
+
+def _keep_ascii_symbol(char):
+    # Tras quitar lo no ASCII y pasar a minúsculas solo se conservan a-z, 0-9, espacios y .,!?-
+    return char in string.ascii_lowercase + string.digits + '.,!?-' or char.isspace()
+
+
+_CLEAN_TABLE = TranslationTable(_clean_char)
+_ASCII_SYMBOLS_TABLE = {code: None for code in range(128) if not _keep_ascii_symbol(chr(code))}
+
+
+def clean(text):
+    """Minúsculas, sin emojis, sin acentos y sin caracteres especiales, en una sola pasada."""
+    # lower() va sobre el texto completo: algunas minúsculas dependen del contexto (sigma final)
+    return text.lower().translate(_CLEAN_TABLE).strip()
+
+
+def clean_many(texts):
+    """Aplica clean a un lote de textos."""
+    return [clean(text) for text in texts]
+
+
+def clean_text(text):
+    """Limpieza para texto de redes: solo ASCII, sin enlaces ni dominios y espacios normalizados."""
+    if not text:
+        return ""
+
+    # Eliminar emojis y caracteres no ASCII, y pasar a minúsculas
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+
+    # Enlaces markdown, URLs y otros dominios, en ese orden (se omiten si no pueden coincidir)
+    if '](' in text:
+        text = MARKDOWN_LINK_RE.sub('', text)
+    if '.' in text or 'http' in text:
+        text = URL_RE.sub('', text)
+    if '.' in text:
+        text = DOMAIN_RE.sub('', text)
+
+    # Eliminar caracteres no alfanuméricos innecesarios (excepto .,!?-) y espacios múltiples
+    return ' '.join(text.translate(_ASCII_SYMBOLS_TABLE).split())
+
+
+def clean_text_many(texts):
+    """Aplica clean_text a un lote de textos."""
+    return [clean_text(text) for text in texts]
+
+
 class TextCleaner:
     @staticmethod
     def to_lowercase(text):
@@ -8,29 +110,7 @@ class TextCleaner:
 
     @staticmethod
     def remove_emojis(text):
-        emoji_pattern = re.compile(
-            "["
-            u"\U0001F600-\U0001F64F"
-            u"\U0001F300-\U0001F5FF"
-            u"\U0001F680-\U0001F6FF"
-            u"\U0001F1E0-\U0001F1FF"
-            u"\U00002500-\U00002BEF"
-            u"\U00002702-\U000027B0"
-            u"\U000024C2-\U0001F251"
-            u"\U0001f926-\U0001f937"
-            u"\U00010000-\U0010ffff"
-            u"\u2640-\u2642"
-            u"\u2600-\u2B55"
-            u"\u200d"
-            u"\u23cf"
-            u"\u23e9"
-            u"\u231a"
-            u"\ufe0f"
-            u"\u3030"
-            "]+",
-            flags=re.UNICODE
-        )
-        return emoji_pattern.sub(r'', text)
+        return EMOJI_RE.sub(r'', text)
 
     @staticmethod
     def remove_accents(text):
@@ -41,12 +121,12 @@ class TextCleaner:
 
     @staticmethod
     def remove_special_chars(text):
-        return re.sub(r'[^\w\s]', '', text)
-
-    @classmethod
-    def clean(cls, text):
-        text = cls.to_lowercase(text)
-        text = cls.remove_emojis(text)
-        text = cls.remove_accents(text)
-        text = cls.remove_special_chars(text)
-        return text.strip()
\ No newline at end of file
+        return SPECIAL_CHARS_RE.sub('', text)
+
+    @staticmethod
+    def clean(text):
+        return clean(text)
+
+    @staticmethod
+    def clean_many(texts):
+        return clean_many(texts)
@@ -0,0 +1,97 @@
+from collections import Counter
+
+from app.config import Config
+from app.Models.models import CommentRedis, DedupRedis, WatermarkRedis
+from app.services.fingerprint import content_fingerprint, dedup_text, hamming_distance, simhash, simhash_bands
+
+
+class SeenContent:
+    """Registros ya aceptados por plataforma, con sus cubos SimHash, compartidos entre lotes de un mismo scrape."""
+
+    def __init__(self):
+        # (plataforma, huella) -> registro aceptado
+        self.records = {}
+        # (plataforma, banda, valor) -> [(huella, simhash)]
+        self.buckets = {}
+
+    def add(self, platform, fingerprint, value, record):
+        self.records[(platform, fingerprint)] = record
+        if value is not None:
+            for band, band_value in enumerate(simhash_bands(value)):
+                self.buckets.setdefault((platform, band, band_value), []).append((fingerprint, value))
+
+    def find(self, platform, fingerprint, value):
+        """Registro aceptado con la misma huella o una SimHash cercana, o None."""
+        if (platform, fingerprint) in self.records:
+            return self.records[(platform, fingerprint)]
+        if value is None:
+            return None
+        for band, band_value in enumerate(simhash_bands(value)):
+            for other_fingerprint, other in self.buckets.get((platform, band, band_value), []):
+                if hamming_distance(value, other) <= Config.DEDUP_MAX_DISTANCE:
+                    return self.records[(platform, other_fingerprint)]
+        return None
+
+
+def dedupe_records(influencer_name, records, seen=None):
+    """
+    Descarta los registros cuyo texto ya está guardado para el influencer en la misma plataforma,
+    o repetido en el propio lote, de forma exacta (misma huella) o casi exacta (SimHash a
+    distancia <= DEDUP_MAX_DISTANCE). Cada descarte no se vuelve a analizar ni guardar, pero
+    cuenta como una repetición del original en los agregados: se suma al comentario guardado
+    (CommentRedis.add_references) o al campo "duplicates" del registro aceptado en este scrape.
+    Se compara el cuerpo del comentario (ver dedup_text); los textos sin palabras no se deduplican.
+    :param seen: SeenContent para detectar también repeticiones de lotes anteriores aún sin guardar
+    :return: registros nuevos, en el orden original
+    """
+    if not Config.DEDUP_ENABLED or not records:
+        return records
+    seen = seen if seen is not None else SeenContent()
+
+    by_platform = {}
+    for record in records:
+        by_platform.setdefault(record.get("platform"), []).append(record)
+
+    # id del comentario guardado -> repeticiones descartadas
+    references = Counter()
+    # Ids de origen de los descartados, para que el scraping incremental no vuelva a traerlos
+    dropped_ids = {}
+    dropped = set()
+    for platform, group in by_platform.items():
+        texts = [dedup_text(record) for record in group]
+        fingerprints = [content_fingerprint(text) for text in texts]
+        hashes = [simhash(text) for text in texts]
+        stored_ids = DedupRedis.get_comment_ids(influencer_name, platform, fingerprints)
+        stored_candidates = DedupRedis.get_simhash_candidates(influencer_name, platform, hashes)
+
+        for record, fingerprint, value, stored_id, candidates in zip(
+                group, fingerprints, hashes, stored_ids, stored_candidates):
+            if fingerprint is None:
+                continue
+            original = None
+            if stored_id is None:
+                original = seen.find(platform, fingerprint, value)
+                if original is None and value is not None:
+                    stored_id = next(
+                        (cid for cid, other in candidates if hamming_distance(value, other) <= Config.DEDUP_MAX_DISTANCE),
+                        None
+                    )
+
+            if stored_id is None and original is None:
+                seen.add(platform, fingerprint, value, record)
+                continue
+
+            if stored_id is not None:
+                references[stored_id] += 1
+            else:
+                original["duplicates"] = original.get("duplicates", 0) + 1
+            dropped.add(id(record))
+            if record.get("source_id"):
+                dropped_ids.setdefault(platform, []).append(record["source_id"])
+
+    CommentRedis.add_references(influencer_name, references)
+    for platform, source_ids in dropped_ids.items():
+        WatermarkRedis.mark_seen(influencer_name, platform, source_ids)
+    if dropped:
+        print(f"Deduplicación: {len(dropped)} de {len(records)} comentarios ya vistos")
+    return [record for record in records if id(record) not in dropped]
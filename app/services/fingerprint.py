@@ -0,0 +1,60 @@
+import hashlib
+
+from app.services.cleaner import clean
+
+# SimHash de 64 bits partido en 4 bandas de 16: dos huellas a distancia <= 3 comparten al menos una banda
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+# Con menos palabras la SimHash no es fiable y solo se usa la huella exacta
+MIN_SIMHASH_TOKENS = 4
+
+
+def normalized_tokens(text):
+    """Palabras del texto limpio (minúsculas, sin acentos, emojis ni signos)."""
+    return clean(text or "").split()
+
+
+def dedup_text(record):
+    """Texto con el que se deduplica un registro: el cuerpo propio si lo tiene (sin título de video)."""
+    return record.get("body", record.get("text", ""))
+
+
+def content_fingerprint(text):
+    """
+    Huella estable del contenido: igual para textos que solo difieren en mayúsculas, signos o espacios.
+    None si no queda ninguna palabra (solo emojis, signos o alfabetos que la limpieza elimina).
+    """
+    normalized = " ".join(normalized_tokens(text))
+    if not normalized:
+        return None
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(text):
+    """SimHash de palabras y pares de palabras, o None si el texto es demasiado corto."""
+    tokens = normalized_tokens(text)
+    if len(tokens) < MIN_SIMHASH_TOKENS:
+        return None
+
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def simhash_bands(value):
+    """Valores de cada banda, usados como claves de los cubos de candidatos."""
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (band * BAND_BITS)) & mask for band in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
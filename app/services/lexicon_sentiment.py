@@ -0,0 +1,133 @@
+import re
+
+from app.services.terms import strip_accents
+
+# Léxico español/inglés (minúsculas, sin tildes) con peso de polaridad
+POSITIVE_WORDS = {
+    # español
+    "bueno": 1.0, "buen": 1.0, "buena": 1.0, "buenisimo": 1.5, "buenisima": 1.5, "excelente": 1.5,
+    "genial": 1.5, "increible": 1.3, "hermoso": 1.3, "hermosa": 1.3, "bonito": 1.0, "bonita": 1.0,
+    "lindo": 1.0, "linda": 1.0, "precioso": 1.3, "preciosa": 1.3, "bello": 1.0, "bella": 1.0,
+    "maravilloso": 1.5, "maravillosa": 1.5, "espectacular": 1.5, "perfecto": 1.3, "perfecta": 1.3,
+    "encanta": 1.3, "encantan": 1.3, "encanto": 1.0, "amo": 1.5, "amor": 1.0, "adoro": 1.5,
+    "gusta": 1.0, "gustan": 1.0, "gracias": 0.8, "felicidades": 1.3, "felicitaciones": 1.3,
+    "bravo": 1.3, "crack": 1.3, "idolo": 1.3, "grande": 0.8, "mejor": 1.0, "mejores": 1.0,
+    "top": 1.0, "chido": 1.3, "chevere": 1.3, "bacano": 1.3, "brutal": 1.0, "fenomenal": 1.5,
+    "divertido": 1.0, "divertida": 1.0, "gracioso": 1.0, "feliz": 1.3, "alegria": 1.3, "orgullo": 1.0,
+    "recomiendo": 1.0, "bendiciones": 1.0, "exito": 1.0, "exitos": 1.0, "talento": 1.0, "talentoso": 1.3,
+    "bienvenido": 1.0, "bienvenida": 1.0, "wow": 1.0, "guapo": 1.0, "guapa": 1.0, "fan": 0.8,
+    "saludos": 0.5, "apoyo": 0.8, "rico": 0.8, "delicioso": 1.3, "deliciosa": 1.3,
+    # inglés
+    "good": 1.0, "great": 1.3, "awesome": 1.5, "amazing": 1.5, "love": 1.5, "loved": 1.5,
+    "like": 0.5, "best": 1.3, "nice": 1.0, "cool": 1.0, "beautiful": 1.3, "excellent": 1.5,
+    "perfect": 1.3, "happy": 1.3, "thanks": 0.8, "thank": 0.8, "fun": 1.0, "funny": 1.0,
+    "wonderful": 1.5, "fantastic": 1.5, "legend": 1.3, "goat": 1.3, "congrats": 1.3,
+    "recommend": 1.0, "enjoy": 1.0, "enjoyed": 1.0, "brilliant": 1.5, "fire": 0.8,
+}
+
+NEGATIVE_WORDS = {
+    # español
+    "malo": 1.0, "mala": 1.0, "mal": 1.0, "pesimo": 1.5, "pesima": 1.5, "horrible": 1.5,
+    "terrible": 1.5, "feo": 1.0, "fea": 1.0, "asco": 1.5, "asqueroso": 1.5, "odio": 1.5,
+    "odia": 1.3, "aburrido": 1.0, "aburrida": 1.0, "basura": 1.5, "porqueria": 1.5, "estafa": 1.5,
+    "estafador": 1.5, "mentira": 1.3, "mentiroso": 1.5, "mentirosa": 1.5, "falso": 1.0, "falsa": 1.0,
+    "fraude": 1.5, "ridiculo": 1.3, "ridicula": 1.3, "verguenza": 1.3, "triste": 1.0, "decepcion": 1.3,
+    "decepcionado": 1.3, "decepcionante": 1.3, "peor": 1.3, "lamentable": 1.3, "patetico": 1.5,
+    "idiota": 1.5, "estupido": 1.5, "estupida": 1.5, "tonto": 1.0, "tonta": 1.0, "payaso": 1.0,
+    "cringe": 1.3, "molesto": 1.0, "molesta": 1.0, "enojado": 1.0, "fracaso": 1.3,
+    "problema": 0.5, "culpa": 0.8, "robo": 1.3, "robar": 1.3, "ladron": 1.5, "racista": 1.5,
+    "nefasto": 1.5, "insoportable": 1.5, "cancelado": 1.0, "cancelar": 0.8, "funado": 1.3,
+    # inglés
+    "bad": 1.0, "worst": 1.5, "awful": 1.5, "hate": 1.5, "hated": 1.5, "boring": 1.0, "trash": 1.5,
+    "garbage": 1.5, "scam": 1.5, "fake": 1.0, "liar": 1.5, "stupid": 1.5, "ugly": 1.0, "sad": 1.0,
+    "disappointed": 1.3, "disappointing": 1.3, "annoying": 1.0, "sucks": 1.5,
+    "pathetic": 1.5, "disgusting": 1.5, "overrated": 1.0, "fraud": 1.5, "poor": 0.8,
+}
+
+NEGATORS = {"no", "nunca", "jamas", "tampoco", "not", "never", "dont", "isnt",
+            "wasnt", "doesnt", "didnt", "cant", "wont"}
+# Negadores que suelen ir delante de un sustantivo ("sin duda", "ni idea", "nada mejor"):
+# solo niegan la palabra que les sigue inmediatamente ("sin gracia", "nada bueno")
+WEAK_NEGATORS = {"ni", "sin", "nada"}
+INTENSIFIERS = {"muy": 1.5, "super": 1.5, "tan": 1.3, "demasiado": 1.3, "re": 1.3, "mega": 1.5,
+                "bastante": 1.2, "really": 1.5, "very": 1.5, "so": 1.3, "too": 1.2, "extremely": 1.8}
+# Palabras de contraste: el texto suele tener polaridad mezclada
+CONTRASTS = {"pero", "aunque", "sino", "but", "however", "though"}
+
+TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+LAUGH_RE = re.compile(r"^(?:j[aeiou]){2,}j?$|^(?:h[ae]){2,}h?$|^(?:lol|lmao|lmfao|xd+)$")
+REPEATED_RE = re.compile(r"(.)\1+")
+# La negación no cruza signos de puntuación ("nunca falla, el mejor")
+CLAUSE_RE = re.compile(r"[,.;:!?¡¿()\n]+")
+
+# Ventana (en tokens) en la que un negador invierte la polaridad
+NEGATION_WINDOW = 3
+# Textos más largos que esto con pocas señales léxicas pierden confianza
+CONFIDENT_LENGTH = 25
+# Confianza máxima si alguna señal quedó negada: la negación es ambigua ("no hay nada mejor")
+# y se deja al LLM salvo que el umbral se configure por debajo
+NEGATED_MAX_CONFIDENCE = 0.5
+
+
+def _lookup(token):
+    """Peso con signo del token en el léxico, probando también sin letras repetidas (buenooo)."""
+    for candidate in (token, REPEATED_RE.sub(r"\1", token)):
+        if candidate in POSITIVE_WORDS:
+            return POSITIVE_WORDS[candidate]
+        if candidate in NEGATIVE_WORDS:
+            return -NEGATIVE_WORDS[candidate]
+    if LAUGH_RE.match(token):
+        return 1.0
+    return 0.0
+
+
+def score_text(text):
+    """
+    Puntúa un texto sin red con léxico y reglas (negación, intensificadores, risas).
+    Recibe texto ya limpio, así que los emojis no cuentan.
+    :return: (sentimiento, score entre -1 y 1, confianza entre 0 y 1)
+    """
+    text = (text or "").lower()
+    tokens = []
+    positive = negative = 0.0
+    negated = False
+    for clause in CLAUSE_RE.split(text):
+        clause_tokens = [strip_accents(t) for t in TOKEN_RE.findall(clause)]
+        tokens.extend(clause_tokens)
+        for i, token in enumerate(clause_tokens):
+            weight = _lookup(token)
+            if not weight:
+                continue
+            if i and clause_tokens[i - 1] in INTENSIFIERS:
+                weight *= INTENSIFIERS[clause_tokens[i - 1]]
+            if (any(t in NEGATORS for t in clause_tokens[max(0, i - NEGATION_WINDOW):i])
+                    or (i and clause_tokens[i - 1] in WEAK_NEGATORS)):
+                weight = -weight * 0.8
+                negated = True
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+
+    total = positive + negative
+    if not total:
+        return 'neutral', 0.0, 0.0
+
+    polarity = (positive - negative) / total
+    score = round(max(-1.0, min(1.0, polarity * min(1.0, total / 2))), 2)
+
+    confidence = abs(polarity) * total / (total + 0.5)
+    if any(t in CONTRASTS for t in tokens):
+        confidence *= 0.5
+    if len(tokens) > CONFIDENT_LENGTH:
+        confidence *= CONFIDENT_LENGTH / len(tokens)
+    if negated:
+        confidence = min(confidence, NEGATED_MAX_CONFIDENCE)
+
+    if score > 0.1:
+        sentiment = 'positivo'
+    elif score < -0.1:
+        sentiment = 'negativo'
+    else:
+        sentiment = 'neutral'
+    return sentiment, score, round(confidence, 3)
@@ -1,21 +1,59 @@
-from multiprocessing import Pool, cpu_count
-from services.cleaner import TextCleaner
+import atexit
+import threading
+from multiprocessing import get_all_start_methods, get_context
+
+from app.config import Config
+from app.services.cleaner import TextCleaner, clean_many
+
+# Trozos por proceso: suficientes para repartir la carga sin pagar un envío por texto
+CHUNKS_PER_PROCESS = 4
+
+_pool = None
+_pool_lock = threading.Lock()
+
 
 def limpiar_texto(text):
     return TextCleaner.clean(text)
 
+
+def get_cleaner_pool():
+    """Pool de procesos compartido; se arranca en el primer lote que lo necesita."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # El proceso principal tiene hilos (Flask, Playwright) y fork directo no es seguro:
+                # forkserver importa el limpiador una vez y los workers se clonan desde ahí
+                context = get_context("forkserver" if "forkserver" in get_all_start_methods() else "spawn")
+                if context.get_start_method() == "forkserver":
+                    context.set_forkserver_preload([__name__])
+                _pool = context.Pool(processes=Config.CLEANER_PROCESSES)
+                atexit.register(_pool.terminate)
+    return _pool
+
+
+def limpiar_textos(textos):
+    """
+    Limpia una lista de textos. Los lotes pequeños se limpian en el propio proceso;
+    los grandes se reparten en trozos entre los procesos del pool.
+    """
+    textos = list(textos)
+    if len(textos) < Config.CLEANER_PARALLEL_THRESHOLD or Config.CLEANER_PROCESSES <= 1:
+        return clean_many(textos)
+
+    chunksize = max(1, len(textos) // (Config.CLEANER_PROCESSES * CHUNKS_PER_PROCESS))
+    return get_cleaner_pool().map(limpiar_texto, textos, chunksize=chunksize)
+
+
 def limpiar_comentarios_parallel(lista_comentarios, key='text'):
     """
     Aplica limpieza de texto paralela usando multiprocessing.
     :param lista_comentarios: lista de diccionarios con al menos la clave 'text'
     :return: misma lista, con los textos limpios
     """
-    textos_originales = [c[key] for c in lista_comentarios]
-
-    with Pool(processes=cpu_count()) as pool:
-        textos_limpios = pool.map(limpiar_texto, textos_originales)
+    textos_limpios = limpiar_textos(c[key] for c in lista_comentarios)
 
     for i, texto_limpio in enumerate(textos_limpios):
         lista_comentarios[i][key] = texto_limpio
 
-    return lista_comentarios
\ No newline at end of file
+    return lista_comentarios
@@ -0,0 +1,67 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket thread-safe que se rellena de forma continua hasta `per_minute` unidades."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount):
+        """Descuenta `amount` si hay saldo; si no, devuelve cuántos segundos esperar."""
+        amount = min(float(amount), self.capacity)
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Limitador compartido de peticiones/min y tokens/min para la API de OpenAI.
+    Tras un 429 se puede pausar globalmente para que todos los hilos respeten el backoff.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self, tokens=1):
+        """Bloquea hasta poder hacer una petición que consume ~`tokens` tokens."""
+        while True:
+            with self._lock:
+                paused = self._paused_until - time.monotonic()
+            if paused > 0:
+                time.sleep(paused)
+                continue
+
+            wait = self.requests.reserve(1)
+            if wait > 0:
+                time.sleep(wait)
+                continue
+
+            wait = self.tokens.reserve(tokens)
+            if wait > 0:
+                # Devolver la petición reservada mientras se espera por tokens
+                with self.requests.lock:
+                    self.requests.tokens = min(self.requests.capacity, self.requests.tokens + 1)
+                time.sleep(wait)
+                continue
+            return
@@ -0,0 +1,67 @@
+import threading
+import time
+from flask import current_app
+
+from app.config import Config
+from app.Models.models import CommentRedis, InfluencerRedis
+
+
+def scrape_age(influencer_name, platform):
+    """Segundos desde el último scrape completado de la plataforma, o None si no consta."""
+    scraped_at = InfluencerRedis.get_scrape_time(influencer_name, platform)
+    return None if scraped_at is None else max(0.0, time.time() - scraped_at)
+
+
+def refresh_in_background(influencer_name, platform, refresh):
+    """Lanza refresh() en un hilo con contexto de app, salvo que ya haya un refresco en curso."""
+    if not InfluencerRedis.begin_refresh(influencer_name, platform, Config.SCRAPE_REFRESH_TIMEOUT):
+        return False
+
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                refresh()
+            except Exception as e:
+                print(f"Error refrescando {platform} de {influencer_name}: {e}")
+            finally:
+                InfluencerRedis.end_refresh(influencer_name, platform)
+
+    threading.Thread(target=run, daemon=True, name=f"refresh-{platform}").start()
+    return True
+
+
+def cached_scrape(influencer_name, platform, refresh, max_age=None):
+    """
+    Política de caché de /api/scrape/<plataforma>:
+    - HIT: el último scrape tiene como mucho max_age segundos (por defecto SCRAPE_CACHE_TTL de la plataforma).
+    - STALE: caducado pero dentro de SCRAPE_CACHE_STALE_SECONDS (o sin fecha registrada y con
+      comentarios guardados); se sirve lo guardado y se refresca en segundo plano. Con max_age
+      explícito no hay margen.
+    - MISS: nunca se scrapeó o es demasiado antiguo; se scrapea antes de responder.
+    Un scrape reciente sin resultados también es un HIT (lista vacía).
+    :param refresh: función sin argumentos que scrapea y guarda la plataforma
+    :return: (comentarios guardados de la plataforma, estado, edad en segundos)
+    """
+    ttl = Config.SCRAPE_CACHE_TTL[platform] if max_age is None else max_age
+    stale_window = Config.SCRAPE_CACHE_STALE_SECONDS if max_age is None else 0
+    age = scrape_age(influencer_name, platform)
+
+    # La frescura depende de cuándo terminó el último scrape, aunque no trajera comentarios
+    if age is not None and age <= ttl + stale_window:
+        cached = CommentRedis.get_comments_by_influencer_and_platform(influencer_name, platform)
+        if age <= ttl:
+            return cached, "HIT", age
+        refresh_in_background(influencer_name, platform, refresh)
+        return cached, "STALE", age
+
+    if age is None:
+        # Datos guardados antes de registrar la fecha por plataforma
+        cached = CommentRedis.get_comments_by_influencer_and_platform(influencer_name, platform)
+        if cached:
+            refresh_in_background(influencer_name, platform, refresh)
+            return cached, "STALE", age
+
+    refresh()
+    return CommentRedis.get_comments_by_influencer_and_platform(influencer_name, platform), "MISS", 0.0
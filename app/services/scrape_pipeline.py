@@ -0,0 +1,221 @@
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import current_app
+
+from app.config import Config
+from app.Models.models import CommentRedis, InfluencerRedis, PLATFORMS, WatermarkRedis
+from app.Scrappers.reddit import RedditScraper
+from app.Scrappers.tiktok import scrape_tiktok
+from app.Scrappers.facebook import FacebookScraper
+from app.services.dedup import SeenContent, dedupe_records
+from app.services.parallel_cleaner import limpiar_comentarios_parallel
+from app.services.sentiment_executor import get_sentiment_executor
+from app.services.single_flight import flight_key, single_flight
+
+
+def influencer_name_from_query(query):
+    return query.replace("#", "").replace("@", "")
+
+
+def ensure_influencer(influencer_name):
+    if not InfluencerRedis.exists(influencer_name):
+        InfluencerRedis.save(influencer_name)
+
+
+def clean_records(records):
+    """Limpia el "text" de los registros en lote y descarta los que quedan vacíos."""
+    return [record for record in limpiar_comentarios_parallel(records) if record["text"]]
+
+
+def analyze_records(records, on_batch=None):
+    """
+    Rellena sentiment/score de cada registro a partir de su "text". Si la clasificación
+    falla se quedan en None: no cuentan en los agregados de sentimiento ni de score.
+    :param on_batch: callback(lista de registros) llamado en cuanto se resuelve cada lote
+    """
+    executor = get_sentiment_executor()
+    texts = [record["text"] for record in records]
+    if on_batch is None:
+        for record, result in zip(records, executor.analyze(texts)):
+            record["sentiment"], record["score"] = result or (None, None)
+        return records
+
+    for indices, results in executor.analyze_iter(texts):
+        batch = []
+        for i, result in zip(indices, results):
+            records[i]["sentiment"], records[i]["score"] = result or (None, None)
+            batch.append(records[i])
+        on_batch(batch)
+    return records
+
+
+def new_record(platform, influencer_name, text, date, source_id=None, body=None):
+    record = {
+        "platform": platform,
+        "influencer": influencer_name,
+        "text": text,
+        "sentiment": None,
+        "score": None,
+        "date": date
+    }
+    if source_id:
+        # Id en la plataforma de origen, para el scraping incremental
+        record["source_id"] = source_id
+    if body is not None:
+        # Texto propio del comentario cuando "text" lleva contexto añadido (título del video)
+        record["body"] = body
+    return record
+
+
+def drop_seen(influencer_name, platform, records):
+    """Descarta los registros cuyo id de origen ya se procesó en un scrape anterior."""
+    source_ids = [record["source_id"] for record in records if "source_id" in record]
+    flags = iter(WatermarkRedis.seen_flags(influencer_name, platform, source_ids))
+    return [record for record in records if "source_id" not in record or not next(flags)]
+
+
+def scrape_reddit_comments(influencer_name, keywords, limit, on_batch=None, include_comments=False,
+                           max_api_calls=None):
+    """
+    Busca en Reddit y devuelve los posts analizados como comentarios (sin guardar).
+    :param include_comments: añadir también los comentarios top de cada post como registros propios
+    :param max_api_calls: presupuesto de llamadas a la API de Reddit (por defecto Config.REDDIT_MAX_API_CALLS)
+    """
+    scraper = RedditScraper(
+        keywords=keywords, limit=limit, fetch_comments=include_comments, max_api_calls=max_api_calls,
+        since=WatermarkRedis.get_since(influencer_name, "reddit"),
+        is_seen=lambda ids: WatermarkRedis.seen_flags(influencer_name, "reddit", ids)
+    )
+    raw_posts = scraper.scrape()
+
+    records = []
+    for post in raw_posts:
+        date = post['created_utc'].isoformat()
+        records.append(new_record("reddit", influencer_name, f"{post['title']} {post['selftext']}".strip(), date,
+                                  f"t3_{post['post_id']}"))
+        records.extend(new_record("reddit", influencer_name, comment, date, comment_id)
+                       for comment, comment_id in zip(post['top_comments'], post['top_comment_ids']) if comment)
+    return analyze_records(dedupe_records(influencer_name, records), on_batch)
+
+
+def scrape_tiktok_comments(influencer_name, query, limit, on_batch=None):
+    """Scrapea comentarios de TikTok y los devuelve analizados (sin guardar)."""
+    tiktok_comments = scrape_tiktok(
+        query=query, num_videos=limit,
+        is_seen=lambda ids: WatermarkRedis.seen_flags(influencer_name, "tiktok", ids)
+    )
+    WatermarkRedis.mark_seen(influencer_name, "tiktok", {f"video:{c['video_id']}" for c in tiktok_comments})
+
+    records = [
+        new_record("tiktok", influencer_name, f"{c['title']} {c['text']}".strip(), datetime.utcnow().isoformat(),
+                   c['id'], body=c['text'])
+        for c in tiktok_comments
+    ]
+    records = drop_seen(influencer_name, "tiktok", records)
+    return analyze_records(dedupe_records(influencer_name, clean_records(records)), on_batch)
+
+
+def scrape_facebook_comments(influencer_name, query, on_batch=None):
+    """
+    Consulta el scraper local de Facebook y devuelve los comentarios analizados (sin guardar).
+    Los posts se procesan según llegan: cada grupo de FACEBOOK_ANALYSIS_BATCH comentarios se
+    limpia, deduplica y empieza a analizarse mientras el resto de la respuesta se sigue descargando.
+    """
+    seen = SeenContent()
+    futures = []
+    pending = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        def flush():
+            records = drop_seen(influencer_name, "facebook", pending)
+            records = dedupe_records(influencer_name, clean_records(records), seen)
+            if records:
+                futures.append(executor.submit(analyze_records, records, on_batch))
+
+        try:
+            for post in FacebookScraper().iter_posts(query):
+                for comment in post.get("comments", []):
+                    full_text = comment.get("comment", "").strip()
+                    source_id = f"{post.get('postId')}:{comment['commentId']}" if comment.get("commentId") else None
+                    pending.append(new_record("facebook", influencer_name, full_text,
+                                              post.get("date", datetime.utcnow().isoformat()), source_id))
+                if len(pending) >= Config.FACEBOOK_ANALYSIS_BATCH:
+                    flush()
+                    pending = []
+        except Exception as e:
+            print(f"Failed to fetch results: {e}")
+        if pending:
+            flush()
+
+        return [record for future in futures for record in future.result()]
+
+
+def scrape_platform(platform, influencer_name, query, limit, on_batch=None, **options):
+    """
+    Scrapea, analiza y guarda una plataforma; devuelve los comentarios guardados.
+    Las peticiones simultáneas con los mismos parámetros, en cualquier proceso, comparten un
+    único scrape; las que se suman a uno en curso reciben sus comentarios en un solo lote.
+    :param options: opciones propias de Reddit (keywords, include_comments, max_api_calls)
+    """
+    key = flight_key(platform, influencer_name, query, limit, options)
+    comments, shared = single_flight(
+        key, lambda: _scrape_platform(platform, influencer_name, query, limit, on_batch, **options)
+    )
+    if shared and on_batch and comments:
+        on_batch(comments)
+    return comments
+
+
+def _scrape_platform(platform, influencer_name, query, limit, on_batch=None, **options):
+    if platform == "reddit":
+        keywords = options.pop("keywords", None) or [query]
+        comments = scrape_reddit_comments(influencer_name, keywords, limit, on_batch, **options)
+    elif platform == "tiktok":
+        comments = scrape_tiktok_comments(influencer_name, query, limit, on_batch)
+    else:
+        comments = scrape_facebook_comments(influencer_name, query, on_batch)
+
+    CommentRedis.save_comments_bulk(influencer_name, comments)
+    InfluencerRedis.mark_scraped(influencer_name, platform)
+    return comments
+
+
+def run_scrape_all(query, limit, on_platform_start=None, on_platform_done=None, on_batch=None):
+    """
+    Ejecuta los 3 scrapers en paralelo y guarda cada plataforma en cuanto termina.
+    :param on_platform_start: callback(platform) al empezar cada plataforma
+    :param on_platform_done: callback(platform, comments, error) al terminar cada plataforma
+    :param on_batch: callback(comentarios) por cada lote analizado, de cualquier plataforma
+    :return: comentarios de todas las plataformas, en el orden de PLATFORMS
+    """
+    influencer_name = influencer_name_from_query(query)
+    ensure_influencer(influencer_name)
+
+    # Los hilos no heredan el contexto de la app (RedditScraper lee current_app.config)
+    app = current_app._get_current_object()
+
+    def run(platform):
+        with app.app_context():
+            if on_platform_start:
+                on_platform_start(platform)
+            return scrape_platform(platform, influencer_name, query, limit, on_batch)
+
+    platform_results = {}
+    with ThreadPoolExecutor(max_workers=len(PLATFORMS)) as executor:
+        futures = {executor.submit(run, platform): platform for platform in PLATFORMS}
+        for future in as_completed(futures):
+            platform = futures[future]
+            try:
+                platform_results[platform] = future.result()
+            except Exception as e:
+                print(f"Error in scrapper thread ({platform}): {e}")
+                if on_platform_done:
+                    on_platform_done(platform, [], e)
+                continue
+            if on_platform_done:
+                on_platform_done(platform, platform_results[platform], None)
+
+    results = []
+    for platform in PLATFORMS:
+        results.extend(platform_results.get(platform, []))
+    return results
@@ -0,0 +1,94 @@
+import threading
+import time
+from datetime import datetime
+
+from app.config import Config
+from app.Models.models import ScrapeJobRedis
+from app.Scrappers.browser_pool import get_browser_pool
+from app.services.scrape_pipeline import run_scrape_all
+
+# Cada cuánto se refresca updated_at de un job en curso (para no tomarlo por caído)
+HEARTBEAT_SECONDS = 60
+
+
+def process_job(job_id):
+    """Ejecuta un job de scraping y va publicando el progreso por plataforma."""
+    job = ScrapeJobRedis.get(job_id)
+    if not job:
+        print(f"Job {job_id} no encontrado (expirado?)")
+        return
+
+    ScrapeJobRedis.update(job_id, status="running", started_at=datetime.utcnow().isoformat())
+
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            ScrapeJobRedis.update(job_id)
+
+    def on_platform_start(platform):
+        ScrapeJobRedis.update_platform(job_id, platform, "running")
+
+    def on_platform_done(platform, comments, error):
+        if error:
+            ScrapeJobRedis.update_platform(job_id, platform, "failed", count=0, error=str(error))
+        else:
+            ScrapeJobRedis.save_results(job_id, platform, comments)
+            ScrapeJobRedis.update_platform(job_id, platform, "done", count=len(comments))
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        run_scrape_all(job["query"], job["limit"], on_platform_start, on_platform_done)
+        ScrapeJobRedis.update(job_id, status="done", finished_at=datetime.utcnow().isoformat())
+    except Exception as e:
+        print(f"Error en job {job_id}: {e}")
+        ScrapeJobRedis.update(job_id, status="failed", error=str(e), finished_at=datetime.utcnow().isoformat())
+    finally:
+        stop.set()
+
+
+def run_worker(app, concurrency=None):
+    """Consume jobs de la cola con `concurrency` hilos hasta que se interrumpa el proceso."""
+    concurrency = concurrency or Config.SCRAPE_WORKER_CONCURRENCY
+    if Config.TIKTOK_BROWSER_POOL_WARM:
+        # Lanzar ya los contextos de Chromium para que el primer job no pague el arranque
+        get_browser_pool()
+
+    requeue_lock = threading.Lock()
+    next_requeue = 0.0
+
+    def requeue_stale():
+        """
+        Reencola los jobs que dejó en proceso un worker caído (este u otro); al arrancar y
+        luego cada SCRAPE_JOB_REQUEUE_INTERVAL segundos, desde uno solo de los hilos.
+        """
+        nonlocal next_requeue
+        with requeue_lock:
+            if time.monotonic() < next_requeue:
+                return
+            next_requeue = time.monotonic() + Config.SCRAPE_JOB_REQUEUE_INTERVAL
+        requeued = ScrapeJobRedis.requeue_stale(Config.SCRAPE_JOB_STALE_SECONDS)
+        if requeued:
+            print(f"Reencolados {requeued} jobs abandonados")
+
+    def loop():
+        # Un error de Redis (al reencolar, tomar o confirmar un job) no debe matar el hilo
+        while True:
+            try:
+                requeue_stale()
+                job_id = ScrapeJobRedis.dequeue(timeout=5)
+                if not job_id:
+                    continue
+                with app.app_context():
+                    process_job(job_id)
+                ScrapeJobRedis.ack(job_id)
+            except Exception as e:
+                print(f"Error en el worker de scraping: {e}")
+                time.sleep(5)
+
+    threads = [threading.Thread(target=loop, daemon=True, name=f"scrape-worker-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    print(f"Worker de scraping iniciado con {concurrency} hilos")
+    for thread in threads:
+        thread.join()
@@ -0,0 +1,118 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app.config import Config
+from app.OpenAIConfig.openai_client import OpenAIClient
+from app.services.lexicon_sentiment import score_text
+from app.services.rate_limiter import RateLimiter
+
+
+class SentimentExecutor:
+    """
+    Ejecutor de clasificación de sentimiento compartido por todo el proceso.
+    Los textos que el clasificador léxico resuelve con confianza suficiente no salen del
+    proceso; el resto se reparte en lotes de analyze_sentiment_batch entre un pool acotado
+    de hilos, detrás de un limitador global de peticiones/min y tokens/min.
+    """
+
+    def __init__(self, max_workers=None, requests_per_minute=None, tokens_per_minute=None,
+                 lexicon_threshold=None):
+        self.limiter = RateLimiter(
+            requests_per_minute or Config.OPENAI_REQUESTS_PER_MINUTE,
+            tokens_per_minute or Config.OPENAI_TOKENS_PER_MINUTE
+        )
+        self.client = OpenAIClient(api_key=Config.OPENAI_API_KEY, limiter=self.limiter)
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or Config.OPENAI_MAX_CONCURRENCY,
+            thread_name_prefix="sentiment"
+        )
+        self.lexicon_threshold = (lexicon_threshold if lexicon_threshold is not None
+                                  else Config.SENTIMENT_LEXICON_THRESHOLD)
+        self._stats_lock = threading.Lock()
+        self.lexicon_count = 0
+        self.cache_count = 0
+        self.llm_count = 0
+
+    def _triage(self, texts):
+        """
+        Separa los textos que resuelve el léxico de los que hay que escalar al LLM.
+        :return: (índices locales, resultados locales, índices a escalar)
+        """
+        local_indices, local_results, escalated = [], [], []
+        for i, text in enumerate(texts):
+            if Config.SENTIMENT_LEXICON_ENABLED:
+                sentiment, score, confidence = score_text(text)
+                if confidence >= self.lexicon_threshold:
+                    local_indices.append(i)
+                    local_results.append((sentiment, score))
+                    continue
+            escalated.append(i)
+
+        with self._stats_lock:
+            self.lexicon_count += len(local_indices)
+        print(f"Sentimiento: {len(local_indices)} por léxico, {len(escalated)} a la caché o al LLM")
+        return local_indices, local_results, escalated
+
+    def _escalated_counter(self, escalated):
+        """Callback on_cache_hits que reparte los textos escalados entre la caché y el LLM."""
+        def count(cache_hits):
+            with self._stats_lock:
+                self.cache_count += cache_hits
+                self.llm_count += len(escalated) - cache_hits
+        return count
+
+    def analyze(self, texts):
+        """Clasifica texts con varios lotes en vuelo; devuelve [(sentimiento, score)] en orden."""
+        texts = list(texts)
+        results = [None] * len(texts)
+        local_indices, local_results, escalated = self._triage(texts)
+        for i, result in zip(local_indices, local_results):
+            results[i] = result
+        llm_results = self.client.analyze_sentiment_batch([texts[i] for i in escalated], map_fn=self._pool.map,
+                                                          on_cache_hits=self._escalated_counter(escalated))
+        for i, result in zip(escalated, llm_results):
+            results[i] = result
+        return results
+
+    def analyze_iter(self, texts):
+        """Como analyze, pero genera (índices, resultados) según va terminando cada lote."""
+        texts = list(texts)
+        local_indices, local_results, escalated = self._triage(texts)
+        if local_indices:
+            yield local_indices, local_results
+        batches = self.client.iter_sentiment_batches([texts[i] for i in escalated], map_fn=self._map_unordered,
+                                                     on_cache_hits=self._escalated_counter(escalated))
+        for indices, results in batches:
+            yield [escalated[i] for i in indices], results
+
+    def stats(self):
+        """Cuántos textos resolvió cada camino en este proceso (léxico, caché de sentimientos o LLM)."""
+        with self._stats_lock:
+            total = self.lexicon_count + self.cache_count + self.llm_count
+            return {
+                "lexicon": self.lexicon_count,
+                "cache": self.cache_count,
+                "llm": self.llm_count,
+                "lexicon_ratio": round(self.lexicon_count / total, 4) if total else 0.0,
+                "lexicon_enabled": Config.SENTIMENT_LEXICON_ENABLED,
+                "lexicon_threshold": self.lexicon_threshold
+            }
+
+    def _map_unordered(self, fn, items):
+        futures = [self._pool.submit(fn, item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_sentiment_executor():
+    """Devuelve el ejecutor global, creándolo la primera vez."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = SentimentExecutor()
+    return _executor
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import threading
+import time
+from redis.exceptions import LockError
+
+from app.config import Config
+from app.Models.models import ScrapeFlightRedis
+
+# Cada cuánto mira quien espera si el scrape en curso ya publicó su resultado
+POLL_SECONDS = 0.25
+
+
+def flight_key(*parts):
+    """Clave estable para una combinación de parámetros (listas y dicts incluidos)."""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def keep_alive(lock, stop, lease):
+    """Renueva el lock cada tercio de su vida mientras el scrape siga en marcha."""
+    while not stop.wait(lease / 3):
+        try:
+            lock.reacquire()
+        except LockError as e:
+            print(f"Se perdió el lock del scrape: {e}")
+            return
+
+
+def run_leader(key, lock, fn):
+    """Ejecuta fn() con el lock tomado y publica su resultado (o error) antes de soltarlo."""
+    token = ScrapeFlightRedis.token(lock)
+    stop = threading.Event()
+    threading.Thread(target=keep_alive, args=(lock, stop, Config.SCRAPE_FLIGHT_LEASE), daemon=True).start()
+    try:
+        result = fn()
+        ScrapeFlightRedis.save_result(key, token, comments=result)
+        return result
+    except Exception as e:
+        ScrapeFlightRedis.save_result(key, token, error=str(e))
+        raise
+    finally:
+        stop.set()
+        try:
+            lock.release()
+        except LockError:
+            pass  # el lock ya expiró; otro proceso puede haberlo tomado
+
+
+def wait_for_result(key, token, deadline):
+    """
+    Espera al resultado del scrape con ese token. Devuelve None si el lock desaparece sin
+    resultado (el proceso que lo tenía se cayó y el lock expiró).
+    """
+    while True:
+        result = ScrapeFlightRedis.get_result(key, token)
+        if result is not None:
+            return result
+        if ScrapeFlightRedis.holder(key) != token:
+            # Puede haber publicado justo antes de soltar el lock
+            return ScrapeFlightRedis.get_result(key, token)
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Tiempo agotado esperando el scrape en curso ({key})")
+        time.sleep(POLL_SECONDS)
+
+
+def single_flight(key, fn):
+    """
+    Ejecuta fn() una sola vez a la vez por clave entre todos los procesos. Quien llega con un
+    scrape igual ya en marcha espera y recibe su mismo resultado. El lock se renueva mientras
+    fn() corre, así que si el proceso se cae expira en SCRAPE_FLIGHT_LEASE segundos y otro
+    lo retoma.
+    :param fn: función sin argumentos cuyo resultado sea serializable a JSON
+    :return: (resultado, True si se compartió el de otra ejecución)
+    """
+    deadline = time.monotonic() + Config.SCRAPE_FLIGHT_WAIT_TIMEOUT
+    while True:
+        lock = ScrapeFlightRedis.acquire(key, Config.SCRAPE_FLIGHT_LEASE)
+        if lock:
+            return run_leader(key, lock, fn), False
+
+        token = ScrapeFlightRedis.holder(key)
+        result = wait_for_result(key, token, deadline) if token else None
+        if result is None:
+            continue
+        if "error" in result:
+            raise RuntimeError(f"Falló el scrape compartido: {result['error']}")
+        return result["comments"], True
@@ -0,0 +1,38 @@
+import re
+import unicodedata
+from wordcloud import STOPWORDS
+
+# Palabras vacías en español (sin tildes; se comparan contra la palabra sin acentos)
+SPANISH_STOPWORDS = {
+    "a", "al", "algo", "algun", "alguna", "algunas", "alguno", "algunos", "ante", "antes",
+    "asi", "aun", "aunque", "bien", "cada", "casi", "como", "con", "contra", "cual",
+    "cuales", "cuando", "de", "del", "desde", "donde", "dos", "el", "ella", "ellas",
+    "ellos", "en", "entre", "era", "eran", "eres", "es", "esa", "esas", "ese", "eso",
+    "esos", "esta", "estaba", "estan", "estar", "estas", "este", "esto", "estos", "fue",
+    "fueron", "ha", "hace", "hacer", "han", "hasta", "hay", "la", "las", "le", "les",
+    "lo", "los", "mas", "me", "mi", "mis", "mismo", "mucho", "muy", "nada", "ni", "no",
+    "nos", "nosotros", "nuestra", "nuestro", "o", "otra", "otro", "otros", "para", "pero",
+    "poco", "por", "porque", "que", "quien", "se", "sea", "ser", "si", "sido", "sin",
+    "sobre", "solo", "son", "su", "sus", "tambien", "tan", "tanto", "te", "tengo", "tiene",
+    "tienen", "todo", "todos", "tu", "tus", "un", "una", "uno", "unos", "usted", "va",
+    "vamos", "van", "y", "ya", "yo", "jaja", "jajaja", "jajajaja", "xd", "see", "more"
+}
+
+STOP_WORDS = {w.lower() for w in STOPWORDS} | SPANISH_STOPWORDS
+
+# Palabras de al menos 3 letras (sin dígitos ni guiones bajos)
+WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+
+def strip_accents(word):
+    return ''.join(c for c in unicodedata.normalize('NFKD', word) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Palabras del texto en minúsculas, sin palabras vacías, para la nube de palabras."""
+    if not text:
+        return []
+    return [
+        word for word in WORD_RE.findall(text.lower())
+        if strip_accents(word) not in STOP_WORDS
+    ]
@@ -0,0 +1,52 @@
+import base64
+import hashlib
+from io import BytesIO
+from wordcloud import WordCloud
+
+from app.config import Config
+from app.Models.models import WordCloudRedis
+
+
+def layout_seed(influencer_name):
+    """Semilla estable por influencer: las mismas frecuencias se dibujan igual en cualquier proceso."""
+    return int.from_bytes(hashlib.blake2b(influencer_name.encode('utf-8'), digest_size=4).digest(), 'big')
+
+
+def render_wordcloud(frequencies, seed=None):
+    """
+    Renderiza la nube a PNG directamente desde frecuencias (sin matplotlib).
+    :param seed: random_state de la disposición y los colores; con la misma semilla el PNG es idéntico
+    """
+    wordcloud = WordCloud(
+        width=800,
+        height=400,
+        background_color='white',
+        max_words=Config.WORDCLOUD_MAX_WORDS,
+        colormap='viridis',
+        random_state=seed
+    ).generate_from_frequencies(frequencies)
+
+    buffer = BytesIO()
+    wordcloud.to_image().save(buffer, format='png')
+    return buffer.getvalue()
+
+
+def get_wordcloud(influencer_name, version):
+    """
+    PNG de la nube de palabras del influencer en base64 y su ETag (hash del PNG), cacheados
+    para esa versión de la tabla de frecuencias. Devuelve (None, None) si aún no hay palabras.
+    :param version: versión leída por quien llama, para que el ETag y la imagen correspondan
+    """
+    cached = WordCloudRedis.get_image(influencer_name, version)
+    if cached:
+        return cached
+
+    frequencies = WordCloudRedis.get_frequencies(influencer_name, Config.WORDCLOUD_MAX_WORDS)
+    if not frequencies:
+        return None, None
+
+    png = render_wordcloud(frequencies, layout_seed(influencer_name))
+    etag = hashlib.blake2b(png, digest_size=16).hexdigest()
+    img_base64 = base64.b64encode(png).decode('utf-8')
+    WordCloudRedis.save_image(influencer_name, version, img_base64, etag)
+    return img_base64, etag
@@ -1,7 +1,9 @@
 from app import create_app
 import os
 from dotenv import load_dotenv
+from app.config import Config
 from app.Executable_Scripts.run_facebook import execute_facebook
+from app.Scrappers.browser_pool import get_browser_pool
 
 load_dotenv()  # Carfar desde ENV
 
@@ -12,5 +14,10 @@ with app.app_context():
     # Run the Facebook scraper 
     execute_facebook()
 
+# Lanzar ya los contextos de Chromium (no en el proceso vigilante del recargador de debug,
+# que no atiende peticiones y bloquearía los perfiles)
+if Config.TIKTOK_BROWSER_POOL_WARM and (__name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN")):
+    get_browser_pool()
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=9090, debug=True)